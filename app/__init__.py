@@ -1,85 +1,177 @@
 import os
+import time
+from contextlib import contextmanager
+
+_IMPORT_STARTED = time.perf_counter()
+
 from flask import Flask
-from .models import db
+from .models import db, compressed_json
 from .config import config
-from sqlalchemy import text, inspect
+from .services.cache import calculator_cache
+from .services.db_pool import engine_options, init_pool
+from .services.metrics import init_metrics
+from .services.profiler import init_profiler
+from .services.query_audit import init_query_audit
+from .services.stored_tables import validate_mode
+from .services.table_format import validate_format
+from .services.write_behind import init_write_behind
+from sqlalchemy import text
+
+_IMPORT_MS = (time.perf_counter() - _IMPORT_STARTED) * 1000
+
+
+@contextmanager
+def _phase(phases, name):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        phases.append((name, round((time.perf_counter() - started) * 1000, 3)))
+
 
 def create_app(config_name=None):
     if config_name is None:
         config_name = os.environ.get('FLASK_ENV', 'default')
-    
-    app = Flask(__name__)
-    app.config.from_object(config[config_name])
-    
-    # Validação simples de config
-    try:
-        config[config_name].validate_database_config()
-    except (ValueError, AttributeError) as e:
-        app.logger.error(f"Erro de configuração: {e}")
-    
-    db.init_app(app)
-    register_blueprints(app)
-    
-    with app.app_context():
-        setup_database(app)
-    
+
+    started = time.perf_counter()
+    phases = [('imports', round(_IMPORT_MS, 3))]
+
+    with _phase(phases, 'config'):
+        app = Flask(__name__)
+        app.config.from_object(config[config_name])
+
+        # Validação simples de config
+        try:
+            config[config_name].validate_database_config()
+        except (ValueError, AttributeError) as e:
+            app.logger.error(f"Erro de configuração: {e}")
+
+        calculator_cache.configure(
+            app.config['CALCULATOR_CACHE_SIZE'],
+            app.config['CALCULATOR_CACHE_TTL']
+        )
+
+        validate_format(app.config['OUTPUT_TABLE_FORMAT'])
+        validate_mode(app.config['OUTPUT_STORAGE_MODE'])
+        compressed_json.configure(
+            app.config['OUTPUT_COMPRESSION'],
+            app.config['OUTPUT_COMPRESSION_LEVEL']
+        )
+
+        app.config.setdefault(
+            'SQLALCHEMY_ENGINE_OPTIONS',
+            engine_options(app, config[config_name])
+        )
+
+    with _phase(phases, 'db'):
+        db.init_app(app)
+        init_pool(app)
+    with _phase(phases, 'instrumentation'):
+        init_metrics(app)
+        init_query_audit(app)
+        init_profiler(app)
+    with _phase(phases, 'write_behind'):
+        init_write_behind(app)
+    with _phase(phases, 'blueprints'):
+        register_blueprints(app)
+        register_cli(app)
+
+    # Checagem de schema e seed saíram do boot: `flask setup-db` (ou
+    # DB_SETUP_ON_STARTUP=true para o comportamento antigo)
+    if app.config['DB_SETUP_ON_STARTUP']:
+        with _phase(phases, 'setup_database'):
+            with app.app_context():
+                setup_database(app)
+
+    app.extensions['startup'] = {
+        'phases': phases,
+        'create_app_ms': round((time.perf_counter() - started) * 1000, 3),
+    }
+    app.logger.debug(f"create_app em {app.extensions['startup']['create_app_ms']} ms: {phases}")
     return app
 
 def setup_database(app):
-    """Encapsula a lógica de inicialização do banco de dados"""
+    """Cria as tabelas que faltam, converte o output_data e insere os tipos iniciais (idempotente)"""
     try:
         # Testa a conexão
         db.session.execute(text('SELECT 1'))
-        print("✅ Conexão com MySQL estabelecida com sucesso!")
-        
-        inspector = inspect(db.engine)
-        tables = inspector.get_table_names()
-        
+        app.logger.info("Conexão com o banco estabelecida")
+
         # Importa modelos aqui para o SQLAlchemy "conhecê-los"
         from .models import (
             User, TypeOperation, EntrySAC, EntryPrice, EntryCredit,
             EntryProfit, EntryCET, EntryFixedIncome
         )
 
-        if not tables:
-            print("Empty DB: Criando tabelas automaticamente...")
-            db.create_all()
-            print("Tabelas criadas com sucesso!")
-            # Atualiza a lista de tabelas após criação
-            tables = inspect(db.engine).get_table_names()
-
-        # Seed de dados iniciais (TypeOperation)
-        if 'type_operations' in tables:
-            seed_type_operations()
+        # create_all verifica cada tabela e só cria as ausentes
+        db.create_all()
+        convert_output_columns(app)
+        seed_type_operations(app)
+        return True
 
     except Exception as e:
-        print(f"❌ Erro ao conectar com o banco de dados: {e}")
-        print("Dica: Verifique se o MySQL está rodando e se a URL de conexão está correta.")
+        app.logger.error(f"Erro ao preparar o banco de dados: {e}")
+        return False
 
-def seed_type_operations():
+def convert_output_column(Model, inspector):
+    """Troca `output_data` de JSON para o BLOB do CompressedJSON, se preciso.
+
+    O texto JSON das linhas antigas é mantido (o CompressedJSON lê JSON puro).
+    No SQLite a coluna aceita bytes sem alteração.
+    """
+    from sqlalchemy import LargeBinary
+
+    table_name = Model.__tablename__
+    reflected = {c['name']: c['type'] for c in inspector.get_columns(table_name)}
+    current = reflected.get('output_data')
+    # BLOB/LONGBLOB/BYTEA refletidos não herdam de LargeBinary; compara a afinidade
+    if current is None or current._type_affinity is LargeBinary()._type_affinity:
+        return False
+
+    dialect = db.engine.dialect
+    target = Model.__table__.c.output_data.type.compile(dialect=dialect)
+    if dialect.name == 'mysql':
+        statement = f"ALTER TABLE {table_name} MODIFY output_data {target}"
+    elif dialect.name == 'postgresql':
+        statement = (f"ALTER TABLE {table_name} ALTER COLUMN output_data TYPE {target} "
+                     f"USING convert_to(output_data::text, 'UTF8')")
+    else:
+        return False
+    db.session.execute(text(statement))
+    db.session.commit()
+    return True
+
+def convert_output_columns(app):
+    """Converte o `output_data` de todas as tabelas `entry_*` existentes."""
+    from .models import ENTRY_MODELS
+
+    inspector = db.inspect(db.engine)
+    existing = set(inspector.get_table_names())
+    for Model in ENTRY_MODELS.values():
+        if Model.__tablename__ in existing and convert_output_column(Model, inspector):
+            app.logger.info(f"{Model.__tablename__}: output_data convertida para BLOB")
+
+def seed_type_operations(app):
     """Popula a tabela de tipos se estiver vazia"""
     from .models import TypeOperation
+    from .services.type_registry import TYPE_DEFAULTS
     try:
         if db.session.query(TypeOperation).count() == 0:
-            default_types = [
-                {'name': 'SAC', 'description': 'Sistema de Amortização Constante.'},
-                {'name': 'PRICE', 'description': 'Sistema Francês de amortização.'},
-                {'name': 'Crédito', 'description': 'Simulação de operações de crédito.'},
-                {'name': 'Lucro', 'description': 'Simulação de resultado de negócio.'},
-                {'name': 'CET', 'description': 'Custo Efetivo Total.'},
-                {'name': 'Renda Fixa', 'description': 'Investimentos em renda fixa.'}
-            ]
-            for type_data in default_types:
-                db.session.add(TypeOperation(**type_data))
+            for name, description in TYPE_DEFAULTS.values():
+                db.session.add(TypeOperation(name=name, description=description))
             db.session.commit()
-            print("🌱 Dados iniciais de TypeOperation inseridos.")
+            app.logger.info("Dados iniciais de TypeOperation inseridos")
     except Exception as e:
         db.session.rollback()
-        print(f"Erro ao inserir sementes: {e}")
+        app.logger.error(f"Erro ao inserir sementes: {e}")
 
 def register_blueprints(app):
     try:
         from .routes import register_routes
         register_routes(app)
     except ImportError as e:
-        app.logger.warning(f"Aviso: Não foi possível importar rotas: {e}")
\ No newline at end of file
+        app.logger.warning(f"Aviso: Não foi possível importar rotas: {e}")
+
+def register_cli(app):
+    from .cli import register_commands
+    register_commands(app)
@@ -0,0 +1,137 @@
+"""Comandos `flask` de manutenção (FLASK_APP=wsgi.py).
+
+    flask setup-db         cria as tabelas ausentes, converte o output_data para
+                           BLOB e insere os tipos iniciais
+    flask seed-types       só insere os tipos iniciais
+    flask startup-report   tempos de boot por fase e da primeira requisição
+    flask slim-outputs     tira do output_data as tabelas que podem ser recalculadas
+    flask restore-outputs  regrava as tabelas das linhas enxutas (antes de mudar
+                           ENGINE_VERSION)
+    flask output-size      bytes gravados vs. JSON do output_data, por tabela
+"""
+import time
+
+import click
+
+
+def register_commands(app):
+    app.cli.add_command(setup_db_command)
+    app.cli.add_command(seed_types_command)
+    app.cli.add_command(startup_report_command)
+    app.cli.add_command(slim_outputs_command)
+    app.cli.add_command(restore_outputs_command)
+    app.cli.add_command(output_size_command)
+
+
+@click.command('setup-db')
+def setup_db_command():
+    """Cria as tabelas que faltam, converte o output_data e insere os tipos de operação."""
+    from flask import current_app
+    from . import setup_database
+
+    if not setup_database(current_app):
+        raise click.ClickException('Falha ao preparar o banco (veja o log)')
+    click.echo('Banco pronto: tabelas verificadas e tipos inseridos.')
+
+
+@click.command('seed-types')
+def seed_types_command():
+    """Insere os tipos de operação padrão se a tabela estiver vazia."""
+    from flask import current_app
+    from . import seed_type_operations
+
+    seed_type_operations(current_app)
+    click.echo('Tipos de operação verificados.')
+
+
+@click.command('startup-report')
+@click.option('--path', default='/auth/login', show_default=True,
+              help='Rota usada para medir a primeira requisição')
+def startup_report_command(path):
+    """Mostra o tempo de cada fase do create_app e da primeira requisição."""
+    from flask import current_app
+
+    app = current_app._get_current_object()
+    startup = app.extensions.get('startup', {})
+
+    click.echo('Fase                 ms')
+    for name, ms in startup.get('phases', []):
+        click.echo(f'{name:<18} {ms:>9.1f}')
+    click.echo(f"{'create_app':<18} {startup.get('create_app_ms', 0):>9.1f}")
+
+    client = app.test_client()
+    for label in ('1ª requisição', '2ª requisição'):
+        started = time.perf_counter()
+        response = client.get(path)
+        click.echo(f'{label:<18} {(time.perf_counter() - started) * 1000:>9.1f}  '
+                   f'(GET {path} -> {response.status_code})')
+
+
+@click.command('slim-outputs')
+@click.option('--type', 'kinds', multiple=True,
+              type=click.Choice(['sac', 'price', 'credit', 'fixed_income']),
+              help='Tipos a processar (padrão: todos os recalculáveis)')
+@click.option('--batch-size', default=500, show_default=True, help='Linhas por commit')
+@click.option('--dry-run', is_flag=True, help='Só confere e reporta, sem gravar')
+def slim_outputs_command(kinds, batch_size, dry_run):
+    """Grava só entradas e totais onde o recálculo reproduz a tabela salva."""
+    from .models import type_enum
+    from .services import stored_tables
+
+    selected = [type_enum.Type[name.upper()] for name in kinds] or stored_tables.RECOMPUTABLE
+    click.echo('Tabela                 linhas  enxugadas  divergentes    KB antes  KB depois')
+    for kind in selected:
+        report = stored_tables.slim_rows(kind, batch_size, dry_run)
+        table = stored_tables.ENTRY_MODELS[kind].__tablename__
+        click.echo(f"{table:<20} {report['rows']:>8} {report['slimmed']:>10} {report['mismatched']:>12} "
+                   f"{report['bytes_before'] / 1024:>11.1f} {report['bytes_after'] / 1024:>10.1f}")
+    if dry_run:
+        click.echo('--dry-run: nada foi gravado.')
+
+
+@click.command('restore-outputs')
+@click.option('--type', 'kinds', multiple=True,
+              type=click.Choice(['sac', 'price', 'credit', 'fixed_income']),
+              help='Tipos a processar (padrão: todos os recalculáveis)')
+@click.option('--batch-size', default=500, show_default=True, help='Linhas por commit')
+@click.option('--dry-run', is_flag=True, help='Só conta, sem gravar')
+def restore_outputs_command(kinds, batch_size, dry_run):
+    """Regrava a tabela inteira nas linhas enxutas (rodar antes de mudar ENGINE_VERSION)."""
+    from .models import type_enum
+    from .services import stored_tables
+
+    selected = [type_enum.Type[name.upper()] for name in kinds] or stored_tables.RECOMPUTABLE
+    click.echo('Tabela                 linhas  regravadas  outra versão')
+    stale = 0
+    for kind in selected:
+        report = stored_tables.restore_rows(kind, batch_size, dry_run)
+        table = stored_tables.ENTRY_MODELS[kind].__tablename__
+        stale += report['stale']
+        click.echo(f"{table:<20} {report['rows']:>8} {report['restored']:>11} {report['stale']:>13}")
+    if dry_run:
+        click.echo('--dry-run: nada foi gravado.')
+    if stale:
+        click.echo(f'{stale} linhas de outra versão do motor ficaram só com os totais.')
+
+
+@click.command('output-size')
+@click.option('--batch-size', default=1000, show_default=True, help='Linhas lidas por vez')
+def output_size_command(batch_size):
+    """Mostra, por tabela `entry_*`, quanto a compressão do output_data economiza."""
+    from sqlalchemy import LargeBinary, select, type_coerce
+    from .models import db, ENTRY_MODELS, compressed_json
+
+    click.echo('Tabela                 linhas  comprimidas    KB gravados    KB JSON  economia')
+    for Model in ENTRY_MODELS.values():
+        # Bytes crus da coluna, sem passar pelo CompressedJSON
+        raw = type_coerce(Model.__table__.c.output_data, LargeBinary)
+        query = select(raw).where(raw.is_not(None)).execution_options(yield_per=batch_size)
+        rows = compressed = stored = plain = 0
+        for (data,) in db.session.execute(query):
+            rows += 1
+            compressed += compressed_json.is_compressed(data)
+            stored += len(data)
+            plain += len(compressed_json.decompress_raw(data))
+        saved = (1 - stored / plain) * 100 if plain else 0.0
+        click.echo(f"{Model.__tablename__:<20} {rows:>8} {compressed:>12} "
+                   f"{stored / 1024:>14.1f} {plain / 1024:>10.1f} {saved:>8.1f}%")
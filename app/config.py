@@ -23,8 +23,89 @@ class Config:
 
     SQLALCHEMY_TRACK_MODIFICATIONS: bool = False
 
+    # Pool de conexões (ignorado para SQLite)
+    DB_POOL_SIZE: int = int(env("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(env("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT: int = int(env("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE: int = int(env("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_PRE_PING: bool = env("DB_POOL_PRE_PING", "true").lower() == "true"
+
     DEBUG: bool = env("FLASK_DEBUG", "false").lower() == "true"
 
+    # Checagem de schema e seed no boot de cada worker (antigo padrão);
+    # desligado, o banco é preparado uma vez com `flask setup-db`
+    DB_SETUP_ON_STARTUP: bool = env("DB_SETUP_ON_STARTUP", "false").lower() == "true"
+
+    # Limite de cenários aceitos por requisição em /calculator/batch
+    CALCULATOR_BATCH_MAX_SIZE: int = int(env("CALCULATOR_BATCH_MAX_SIZE", "500"))
+
+    # Prazo máximo (meses) de um cenário em /calculator/batch e na grade PRICE
+    CALCULATOR_MAX_MONTHS: int = int(env("CALCULATOR_MAX_MONTHS", "600"))
+
+    # Limite de células (taxas x prazos) em /calculator/price/grid
+    CALCULATOR_GRID_MAX_CELLS: int = int(env("CALCULATOR_GRID_MAX_CELLS", "10000"))
+
+    # Motor padrão das tabelas PRICE/renda fixa: "float" (legado) ou "cents"
+    CALCULATOR_ENGINE: str = env("CALCULATOR_ENGINE", "float")
+
+    # Formato da `tabela` gravada no output_data: "rows" (legado) ou "columnar"
+    OUTPUT_TABLE_FORMAT: str = env("OUTPUT_TABLE_FORMAT", "rows")
+
+    # Compressão do output_data: "zlib" (padrão), "zstd" (pacote zstandard) ou "none"
+    OUTPUT_COMPRESSION: str = env("OUTPUT_COMPRESSION", "zlib")
+    OUTPUT_COMPRESSION_LEVEL: int = int(env("OUTPUT_COMPRESSION_LEVEL", "6"))
+
+    # "full" grava a tabela inteira; "recompute" grava só entradas e totais de
+    # SAC/PRICE/crédito/renda fixa e recalcula a tabela ao exibir
+    OUTPUT_STORAGE_MODE: str = env("OUTPUT_STORAGE_MODE", "full")
+
+    # Monte Carlo de renda fixa: limites de caminhos e meses, processos e caminhos por bloco
+    MONTE_CARLO_MAX_PATHS: int = int(env("MONTE_CARLO_MAX_PATHS", "100000"))
+    MONTE_CARLO_MAX_MONTHS: int = int(env("MONTE_CARLO_MAX_MONTHS", "600"))
+    MONTE_CARLO_WORKERS: int = int(env("MONTE_CARLO_WORKERS", "2"))
+    MONTE_CARLO_CHUNK_SIZE: int = int(env("MONTE_CARLO_CHUNK_SIZE", "5000"))
+
+    # Paginação do histórico de simulações
+    HISTORY_PAGE_SIZE: int = int(env("HISTORY_PAGE_SIZE", "20"))
+    HISTORY_MAX_PAGE_SIZE: int = int(env("HISTORY_MAX_PAGE_SIZE", "100"))
+
+    # Paginação de /api/users (o modo NDJSON transmite sem limite)
+    USERS_PAGE_SIZE: int = int(env("USERS_PAGE_SIZE", "100"))
+    USERS_MAX_PAGE_SIZE: int = int(env("USERS_MAX_PAGE_SIZE", "1000"))
+
+    # Paginação de /api/types/<id>/operations (sem limit/after a lista é transmitida inteira)
+    OPERATIONS_PAGE_SIZE: int = int(env("OPERATIONS_PAGE_SIZE", "100"))
+    OPERATIONS_MAX_PAGE_SIZE: int = int(env("OPERATIONS_MAX_PAGE_SIZE", "1000"))
+
+    # Cache LRU das calculadoras: número máximo de resultados (0 desativa)
+    # e validade em segundos (0 = sem expiração)
+    CALCULATOR_CACHE_SIZE: int = int(env("CALCULATOR_CACHE_SIZE", "128"))
+    CALCULATOR_CACHE_TTL: int = int(env("CALCULATOR_CACHE_TTL", "3600"))
+
+    # Histogramas de latência por endpoint expostos em /metrics
+    METRICS_ENABLED: bool = env("METRICS_ENABLED", "true").lower() == "true"
+
+    # Auditoria de SQL por requisição: orçamento de consultas, comandos
+    # repetidos (N+1) e lentos, reportados no log e em X-SQL-Audit
+    SQL_AUDIT_ENABLED: bool = env("SQL_AUDIT_ENABLED", "true").lower() == "true"
+    SQL_QUERY_BUDGET: int = int(env("SQL_QUERY_BUDGET", "20"))
+    SQL_REPEAT_THRESHOLD: int = int(env("SQL_REPEAT_THRESHOLD", "5"))
+    SQL_SLOW_QUERY_MS: float = float(env("SQL_SLOW_QUERY_MS", "100"))
+    SQL_AUDIT_LOG_SLOWEST: int = int(env("SQL_AUDIT_LOG_SLOWEST", "3"))
+
+    # Profiler por requisição: só roda com o token em X-Profile ou ?_profile=
+    PROFILER_ENABLED: bool = env("PROFILER_ENABLED", "false").lower() == "true"
+    PROFILER_TOKEN: str = env("PROFILER_TOKEN", "")
+    PROFILER_DIR: str = env("PROFILER_DIR", "")
+    PROFILER_TOP: int = int(env("PROFILER_TOP", "40"))
+
+    # Gravação write-behind das simulações (fila em memória + thread)
+    WRITE_BEHIND_ENABLED: bool = env("WRITE_BEHIND_ENABLED", "false").lower() == "true"
+    WRITE_BEHIND_QUEUE_SIZE: int = int(env("WRITE_BEHIND_QUEUE_SIZE", "1000"))
+    WRITE_BEHIND_BATCH_SIZE: int = int(env("WRITE_BEHIND_BATCH_SIZE", "100"))
+    WRITE_BEHIND_FLUSH_INTERVAL: float = float(env("WRITE_BEHIND_FLUSH_INTERVAL", "0.5"))
+    WRITE_BEHIND_PUT_TIMEOUT: float = float(env("WRITE_BEHIND_PUT_TIMEOUT", "0.05"))
+
     @classmethod
     def build_database_uri(cls) -> str:
         """Constrói a URI de conexão com o banco."""
@@ -36,7 +117,16 @@ class Config:
             f"@{cls.DB_HOST}:{cls.DB_PORT}/{cls.DB_NAME}"
         )
 
-    SQLALCHEMY_DATABASE_URI: str = env("DATABASE_URL") or build_database_uri()
+    @classmethod
+    def build_engine_options(cls) -> dict:
+        """Opções do engine (SQLALCHEMY_ENGINE_OPTIONS) a partir do pool configurado."""
+        return {
+            "pool_size": cls.DB_POOL_SIZE,
+            "max_overflow": cls.DB_MAX_OVERFLOW,
+            "pool_timeout": cls.DB_POOL_TIMEOUT,
+            "pool_recycle": cls.DB_POOL_RECYCLE,
+            "pool_pre_ping": cls.DB_POOL_PRE_PING,
+        }
 
     @classmethod
     def validate_database_config(cls) -> None:
@@ -51,6 +141,10 @@ class Config:
             )
 
 
+# build_database_uri é classmethod: só pode ser chamado depois de a classe existir
+Config.SQLALCHEMY_DATABASE_URI = env("DATABASE_URL") or Config.build_database_uri()
+
+
 class DevelopmentConfig(Config):
     """Configuração de desenvolvimento."""
 
@@ -62,9 +156,34 @@ class ProductionConfig(Config):
 
     DEBUG = False
 
+    # Vários workers gunicorn: pool maior, reciclagem antes do wait_timeout
+    # típico de MySQL gerenciado e pre-ping para descartar conexões mortas
+    DB_POOL_SIZE = int(env("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW = int(env("DB_MAX_OVERFLOW", "20"))
+    DB_POOL_TIMEOUT = int(env("DB_POOL_TIMEOUT", "10"))
+    DB_POOL_RECYCLE = int(env("DB_POOL_RECYCLE", "280"))
+    DB_POOL_PRE_PING = True
+
+    SQL_AUDIT_ENABLED = env("SQL_AUDIT_ENABLED", "false").lower() == "true"
+
+
+class TestingConfig(Config):
+    """Configuração de testes e carga local: SQLite, sem MySQL."""
+
+    TESTING = True
+    DEBUG = False
+
+    # Caminho relativo fica na pasta instance/ do Flask
+    SQLALCHEMY_DATABASE_URI = env("TEST_DATABASE_URL", "sqlite:///ifinance_test.db")
+
+    @classmethod
+    def validate_database_config(cls) -> None:
+        """SQLite local: não depende das variáveis DB_*."""
+
 
 config = {
     "development": DevelopmentConfig,
     "production": ProductionConfig,
+    "testing": TestingConfig,
     "default": DevelopmentConfig,
 }
\ No newline at end of file
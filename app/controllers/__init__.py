@@ -1 +1 @@
-from . import auth_controller, calculator_controller, main_controller, type_operation_controller, user_controller
\ No newline at end of file
+from . import auth_controller, calculator_controller, main_controller, monitoring_controller, type_operation_controller, user_controller
\ No newline at end of file
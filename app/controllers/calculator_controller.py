@@ -1,118 +1,334 @@
-from flask import request, render_template, jsonify
-from ..models import EntrySAC
-
+from flask import request, render_template, jsonify, current_app
+from ..models import EntrySAC, type_enum
+from ..services import lazy_import
+from ..services import table_format
+from ..services.cache import calculator_cache
+from ..services.metrics import timed
+
+# Serviços com NumPy carregados no primeiro uso: o worker sobe sem importar o NumPy
+batch = lazy_import('app.services.batch')
+irr = lazy_import('app.services.irr')
+monte_carlo = lazy_import('app.services.monte_carlo')
+schedules = lazy_import('app.services.schedules')
+
+def _is_truthy(value):
+    """Interpreta flags vindas de form ou JSON ("1", "true", True)."""
+    return str(value).lower() in ('1', 'true')
+
+
+def resolve_engine(data):
+    """Motor das tabelas PRICE/renda fixa: `engine` do form/JSON ou CALCULATOR_ENGINE."""
+    engine = str(data.get('engine') or current_app.config['CALCULATOR_ENGINE']).lower()
+    if engine not in schedules.ENGINES:
+        raise ValueError(f"engine inválido: {engine} (use {', '.join(schedules.ENGINES)})")
+    return engine
+
+
+@timed('calculator')
+@calculator_cache.memoize
 def sac_system_calculation(principal_value, months, interest_rate):
     """Retorna a tabela SAC, juros totais e montante"""
-    
-    amortization = EntrySAC.calculate_amortization(principal_value, months)
+    colunas = schedules.sac_columns(principal_value, months, interest_rate)
 
     total_interest = EntrySAC.calculate_total_interest(
         principal_value,
         months,
         interest_rate
     )
+    total_amount = principal_value + total_interest
 
-    tabela = []
-    saldo = principal_value
+    return schedules.to_rows(colunas), total_interest, total_amount
 
-    for mes in range(1, months + 1):
-        juros = saldo * (interest_rate / 100)
-        prestacao = amortization + juros
-        saldo -= amortization
 
-        tabela.append({
-            "mes": mes,
-            "amortizacao": amortization,
-            "juros": juros,
-            "prestacao": prestacao,
-            "saldo_devedor": max(saldo, 0)
-        })
+@timed('calculator')
+def sac_system_summary(principal_value, months, interest_rate):
+    """Retorna apenas os totais do SAC (forma fechada), sem montar a tabela"""
+    return EntrySAC.calculate_summary(principal_value, months, interest_rate)
 
-    total_amount = principal_value + total_interest
 
-    return tabela, total_interest, total_amount
+def _table_response(payload, columnar):
+    """JSON da resposta; no formato colunar usa o mimetype próprio."""
+    response = jsonify(payload)
+    if columnar:
+        response.mimetype = table_format.COLUMNAR_MIMETYPE
+    response.vary.add('Accept')
+    return response
 
 
 def sac_system_api():
-    """Endpoint API para cálculo SAC: aceita form ou JSON e retorna JSON com tabela e totais."""
+    """Endpoint API para cálculo SAC: aceita form ou JSON e retorna JSON com tabela e totais.
+    Com `summary_only` verdadeiro, retorna só os totais, sem a tabela. Com
+    `?format=columnar` (ou Accept colunar) a tabela vem com uma lista por coluna.
+    """
     try:
-        data = request.get_json() or request.form
+        data = request.get_json(silent=True) or request.form
         principal_value = float(data.get('principal_value'))
         months = int(data.get('months'))
         interest_rate = float(data.get('interest_rate'))
 
+        if _is_truthy(data.get('summary_only')):
+            return jsonify(sac_system_summary(principal_value, months, interest_rate)), 200
+
         tabela, total_interest, total_amount = sac_system_calculation(principal_value, months, interest_rate)
 
-        return jsonify({
-            'tabela': tabela,
+        columnar = table_format.wants_columnar(request)
+        return _table_response({
+            'tabela': table_format.to_columnar(tabela) if columnar else tabela,
             'juros_totais': total_interest,
             'montante': total_amount
-        }), 200
+        }, columnar), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
 
-def price_system_calculation(principal_value, months, interest_rate):
-    """Retorna a tabela PRICE (sistema francês), juros totais e montante"""
-    r = interest_rate / 100.0
-    tabela = []
-    if r == 0:
-        prestacao = round(principal_value / months, 2)
+def _parse_batch_scenario(scenario):
+    """Valida um cenário do lote e devolve (tipo, principal, meses, taxa, tarifas)."""
+    kind = type_enum.Type[str(scenario.get('type', '')).upper()]
+    if kind not in batch.BATCH_TYPES:
+        raise KeyError(kind.name)
+
+    principal_value = float(scenario.get('principal_value'))
+    months = int(scenario.get('months'))
+    interest_rate = float(scenario.get('interest_rate'))
+    if months < 1:
+        raise ValueError('months deve ser maior que zero')
+
+    fees = (
+        float(scenario.get('admin_fees', 0))
+        + float(scenario.get('insurance', 0))
+        + float(scenario.get('taxes', 0))
+    )
+    return kind, principal_value, months, interest_rate, fees
+
+
+def _full_batch_result(kind, principal_value, months, interest_rate, scenario, engine):
+    """Resultado completo (com tabela) de um cenário do lote"""
+    if kind is type_enum.Type.CET:
+        tabela, total_costs, cet_monthly, cet_annual = cet_calculation(
+            principal_value, months, interest_rate,
+            float(scenario.get('admin_fees', 0)),
+            float(scenario.get('insurance', 0)),
+            float(scenario.get('taxes', 0)),
+            engine=engine
+        )
+        return {
+            'tabela': tabela,
+            'custo_total': total_costs,
+            'cet_mensal': cet_monthly,
+            'cet_anual': cet_annual
+        }
+
+    calculation = {
+        type_enum.Type.SAC: sac_system_calculation,
+        type_enum.Type.PRICE: price_system_calculation,
+        type_enum.Type.CREDIT: credit_system_calculation,
+        type_enum.Type.FIXED_INCOME: fixed_income_simulation,
+    }[kind]
+    if kind is type_enum.Type.SAC:
+        tabela, total_interest, total_amount = calculation(principal_value, months, interest_rate)
     else:
-        prestacao = round(principal_value * (r * (1 + r) ** months) / ((1 + r) ** months - 1), 2)
+        tabela, total_interest, total_amount = calculation(
+            principal_value, months, interest_rate, engine=engine
+        )
+    return {'tabela': tabela, 'juros_totais': total_interest, 'montante': total_amount}
+
+
+def batch_simulation_api():
+    """Endpoint API para lotes de cenários (SAC, PRICE, crédito, CET e renda fixa).
+
+    Recebe `{"scenarios": [...], "summary_only": bool}`. Os resumos de cada tipo
+    são calculados juntos numa passada vetorizada; sem `summary_only` cada
+    cenário também recebe sua tabela, montada com o motor `engine` (colunar
+    com `?format=columnar`).
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        scenarios = data.get('scenarios')
+        if not isinstance(scenarios, list) or not scenarios:
+            return jsonify({'error': 'Campo obrigatório: scenarios'}), 400
+
+        max_size = current_app.config['CALCULATOR_BATCH_MAX_SIZE']
+        if len(scenarios) > max_size:
+            return jsonify({'error': f'Lote excede o limite de {max_size} cenários'}), 413
+
+        max_months = current_app.config['CALCULATOR_MAX_MONTHS']
+        summary_only = _is_truthy(data.get('summary_only'))
+        columnar = table_format.wants_columnar(request)
+        engine = resolve_engine(data)
+        results = [None] * len(scenarios)
+        groups = {}
+
+        for index, scenario in enumerate(scenarios):
+            try:
+                parsed = _parse_batch_scenario(scenario)
+            except (KeyError, TypeError, ValueError, AttributeError) as e:
+                results[index] = {'index': index, 'error': f'Cenário inválido: {e}'}
+                continue
+            # Tabelas e fluxos do CET crescem com o prazo: um cenário enorme esgota a memória
+            if parsed[2] > max_months:
+                return jsonify({'error': f'Cenário {index}: months deve estar entre 1 e {max_months}'}), 400
+            groups.setdefault(parsed[0], []).append((index, parsed))
+
+        for kind, items in groups.items():
+            indexes, parsed = zip(*items)
+            _, principal, months, rate, fees = zip(*parsed)
+            summaries = batch.summarize(kind, principal, months, rate, fees, engine)
+
+            for index, (_, p, n, r, _), summary in zip(indexes, parsed, summaries):
+                result = {'index': index, 'type': kind.name.lower(), 'summary': summary}
+                if not summary_only:
+                    result.update(_full_batch_result(kind, p, n, r, scenarios[index], engine))
+                    if columnar:
+                        result['tabela'] = table_format.to_columnar(result['tabela'])
+                results[index] = result
+
+        return _table_response({'results': results}, columnar), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
+
+class GridTooLarge(ValueError):
+    """Grade com mais células que CALCULATOR_GRID_MAX_CELLS."""
+
+
+def _grid_axis(data, key, cast, max_cells):
+    """Eixo da grade: lista explícita ou intervalo {"start", "stop", "step"} (inclusivo).
+
+    O tamanho do intervalo é conferido antes de montar a lista, então um
+    `step` minúsculo não aloca nada.
+    """
+    value = data.get(key)
+    if isinstance(value, dict):
+        start, stop, step = (cast(value[k]) for k in ('start', 'stop', 'step'))
+        if step <= 0:
+            raise ValueError(f'{key}.step deve ser positivo')
+        count = max(int(round((stop - start) / step)) + 1, 0)
+        if count > max_cells:
+            raise GridTooLarge(key)
+        return [cast(round(start + i * step, 6)) for i in range(count)]
+    if isinstance(value, list) and value:
+        if len(value) > max_cells:
+            raise GridTooLarge(key)
+        return [cast(v) for v in value]
+    raise ValueError(f'Campo obrigatório: {key}')
+
+
+def price_grid_api():
+    """Endpoint API com a grade taxa x prazo do PRICE (prestação e juros totais).
+
+    Recebe `principal_value`, `rates` e `terms` (listas ou intervalos) e devolve
+    matrizes com uma linha por taxa e uma coluna por prazo, com os juros do
+    motor `engine`.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        principal_value = float(data.get('principal_value'))
+        max_cells = current_app.config['CALCULATOR_GRID_MAX_CELLS']
+        rates = _grid_axis(data, 'rates', float, max_cells)
+        terms = _grid_axis(data, 'terms', int, max_cells)
+        max_months = current_app.config['CALCULATOR_MAX_MONTHS']
+        if min(terms) < 1 or max(terms) > max_months:
+            return jsonify({'error': f'terms deve conter prazos entre 1 e {max_months}'}), 400
 
-    saldo = principal_value
-    total_interest = 0.0
+        if len(rates) * len(terms) > max_cells:
+            raise GridTooLarge(max_cells)
 
-    for mes in range(1, months + 1):
-        juros = round(saldo * r, 2)
-        amortizacao = round(prestacao - juros, 2)
-        saldo = round(saldo - amortizacao, 2)
-        if saldo < 0:
-            saldo = 0.0
+        grid = batch.price_grid(principal_value, rates, terms, resolve_engine(data))
+        return jsonify({
+            'principal_value': principal_value,
+            'rates': rates,
+            'terms': terms,
+            'prestacao': grid['installment'],
+            'juros_totais': grid['total_interest']
+        }), 200
+    except GridTooLarge:
+        max_cells = current_app.config['CALCULATOR_GRID_MAX_CELLS']
+        return jsonify({'error': f'Grade excede o limite de {max_cells} células'}), 413
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
 
-        tabela.append({
-            "mes": mes,
-            "amortizacao": amortizacao,
-            "juros": juros,
-            "prestacao": prestacao,
-            "saldo_devedor": saldo,
-        })
 
-        total_interest += juros
+@timed('calculator')
+@calculator_cache.memoize
+def price_system_calculation(principal_value, months, interest_rate, engine='float'):
+    """Retorna a tabela PRICE (sistema francês), juros totais e montante"""
+    colunas = schedules.PRICE_ENGINES[engine](principal_value, months, interest_rate)
 
-    total_interest = round(total_interest, 2)
+    total_interest = round(schedules.running_total(colunas["juros"]), 2)
     total_amount = round(principal_value + total_interest, 2)
-    return tabela, total_interest, total_amount
+    return schedules.to_rows(colunas), total_interest, total_amount
 
 
-def credit_system_calculation(principal_value, months, interest_rate):
+@timed('calculator')
+def credit_system_calculation(principal_value, months, interest_rate, engine='float'):
     """Simulação de crédito — por padrão usa o sistema PRICE (parcelas constantes)."""
-    return price_system_calculation(principal_value, months, interest_rate)
+    return price_system_calculation(principal_value, months, interest_rate, engine=engine)
 
 
-def fixed_income_simulation(principal_value, months, interest_rate):
+@timed('calculator')
+@calculator_cache.memoize
+def fixed_income_simulation(principal_value, months, interest_rate, engine='float'):
     """Simulação de renda fixa com capitalização composta mensal.
     Retorna lista de saldos mensais, juros totais e montante final.
     """
-    r = interest_rate / 100.0
-    tabela = []
-    saldo = principal_value
-
-    for mes in range(1, months + 1):
-        juros = round(saldo * r, 2)
-        saldo = round(saldo + juros, 2)
-        tabela.append({
-            "mes": mes,
-            "juros": juros,
-            "saldo": saldo,
-        })
+    colunas = schedules.FIXED_INCOME_ENGINES[engine](principal_value, months, interest_rate)
 
+    saldo = float(colunas["saldo"][-1]) if months > 0 else principal_value
     total_interest = round(saldo - principal_value, 2)
     total_amount = saldo
-    return tabela, total_interest, total_amount
+    return schedules.to_rows(colunas), total_interest, total_amount
+
 
+@timed('calculator')
+def fixed_income_monte_carlo(principal_value, months, interest_rate, paths,
+                             volatility=0.05, reversion=0.1, seed=None):
+    """Projeção estocástica da renda fixa: faixas de percentis do saldo final.
+
+    `volatility` é o choque mensal da taxa em pontos percentuais e `reversion`
+    a fração da distância até `interest_rate` recuperada a cada mês.
+    """
+    result = monte_carlo.project(
+        principal_value, months, interest_rate, paths,
+        volatility=volatility,
+        reversion=reversion,
+        seed=seed,
+        workers=current_app.config['MONTE_CARLO_WORKERS'],
+        chunk_size=current_app.config['MONTE_CARLO_CHUNK_SIZE']
+    )
+    result['deterministic'] = round(principal_value * (1 + interest_rate / 100.0) ** months, 2)
+    return result
 
+
+def fixed_income_monte_carlo_api():
+    """Endpoint API da projeção Monte Carlo de renda fixa (JSON)."""
+    try:
+        data = request.get_json(silent=True) or {}
+        principal_value = float(data.get('principal_value'))
+        months = int(data.get('months'))
+        interest_rate = float(data.get('interest_rate'))
+        paths = int(data.get('paths', 5000))
+        seed = data.get('seed')
+
+        max_paths = current_app.config['MONTE_CARLO_MAX_PATHS']
+        if not 1 <= paths <= max_paths:
+            return jsonify({'error': f'paths deve estar entre 1 e {max_paths}'}), 400
+        # O custo cresce com caminhos x meses: sem teto, um único pedido prende os workers
+        max_months = current_app.config['MONTE_CARLO_MAX_MONTHS']
+        if not 1 <= months <= max_months:
+            return jsonify({'error': f'months deve estar entre 1 e {max_months}'}), 400
+
+        result = fixed_income_monte_carlo(
+            principal_value, months, interest_rate, paths,
+            volatility=float(data.get('volatility', 0.05)),
+            reversion=float(data.get('reversion', 0.1)),
+            seed=int(seed) if seed is not None else None
+        )
+        return jsonify(result), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
+
+@timed('calculator')
 def profit_simulation(revenue, fixed_costs, variable_costs, taxes):
     """Simulação de lucro simples: calcula lucro líquido e margens."""
     revenue = float(revenue)
@@ -138,15 +354,28 @@ def profit_simulation(revenue, fixed_costs, variable_costs, taxes):
     }
 
 
-def cet_calculation(principal_value, months, interest_rate, admin_fees=0.0, insurance=0.0, taxes=0.0):
-    """Cálculo simplificado do CET: soma todos os custos e expressa como percentual do principal.
-    Retorna a tabela mensal (simples), custo total e CET percentual.
+@timed('calculator')
+@calculator_cache.memoize
+def cet_calculation(principal_value, months, interest_rate, admin_fees=0.0, insurance=0.0, taxes=0.0,
+                    engine='float'):
+    """Cálculo do CET como taxa interna de retorno dos fluxos do tomador.
+
+    O tomador recebe o principal descontado de tarifas, seguro e impostos
+    (cobrados na contratação) e paga a prestação PRICE durante `months` meses.
+    Retorna a tabela PRICE, o custo total, o CET mensal e o CET anual (%).
     """
-    # Reaproveita cálculo de juros (PRICE) para total de juros
-    tabela, total_interest, _ = price_system_calculation(principal_value, months, interest_rate)
+    tabela, total_interest, _ = price_system_calculation(principal_value, months, interest_rate, engine=engine)
     total_fees = float(admin_fees) + float(insurance) + float(taxes)
     total_costs = round(total_interest + total_fees, 2)
 
-    cet_percent_total = round((total_costs / principal_value) * 100, 2) if principal_value else 0.0
+    if not principal_value:
+        return tabela, total_costs, 0.0, 0.0
+
+    installment = schedules.price_installment(principal_value, months, interest_rate)
+    (cet_monthly,), (cet_annual,) = irr.cet_rates(principal_value, months, installment, total_fees)
+    return tabela, total_costs, cet_monthly, cet_annual
+
 
-    return tabela, total_costs, cet_percent_total
+def cache_stats_api():
+    """Endpoint API com os contadores do cache das calculadoras"""
+    return jsonify(calculator_cache.stats()), 200
@@ -1,30 +1,24 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, session
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, session, current_app
 from functools import wraps
+from sqlalchemy.orm import undefer
 from app import db
-from ..models import db, EntrySAC, EntryPrice, EntryCredit, EntryProfit, EntryCET, EntryFixedIncome, User, TypeOperation, type_enum
+from ..models import db, EntrySAC, EntryPrice, EntryCredit, EntryProfit, EntryCET, EntryFixedIncome, User, type_enum
 from ..controllers import *
+from ..services import history as history_service
+from ..services import stored_tables
+from ..services import table_format
+from ..services import type_registry
+from ..services.summary import build_summary
 
 
-def _get_or_create_type_by_name(name, description=None):
-    """Retorna instância TypeOperation existente ou cria uma nova."""
-    try:
-        t = TypeOperation.query.filter(TypeOperation.name.ilike(f"%{name}%")).first()
-        if t:
-            return t
-        t = TypeOperation(name=name, description=description or name)
-        db.session.add(t)
-        db.session.commit()
-        return t
-    except Exception:
-        db.session.rollback()
-        # fallback: tentar buscar sem criar
-        return TypeOperation.query.filter_by(name=name).first()
-
+def _save_entry(Model, **values):
+    """Persiste a simulação: enfileira no write-behind (se ativo) ou grava já."""
+    writer = current_app.extensions.get('write_behind')
+    if writer is not None and writer.submit(Model, values):
+        return
+    db.session.add(Model(**values))
+    db.session.commit()
 
-def _get_or_create_type_from_enum(enum_val):
-    """Garante que exista um TypeOperation para o enum passado."""
-    name = enum_val.name if hasattr(enum_val, 'name') else str(enum_val)
-    return _get_or_create_type_by_name(name, description=name)
 
 def login_required(f):
     """Decorator para rotas que requerem login"""
@@ -57,25 +51,33 @@ def simulate():
 
 @login_required
 def history():
-    """Página de histórico"""
+    """Página de histórico (paginada por cursor)"""
     user_id = session['user_id']
-    simulations = []
+    page = {'rows': [], 'next_cursor': None, 'prev_cursor': None}
     try:
-        sims = []
-        sims += EntrySAC.query.filter_by(user_id=user_id).all()
-        sims += EntryPrice.query.filter_by(user_id=user_id).all()
-        sims += EntryCredit.query.filter_by(user_id=user_id).all()
-        sims += EntryCET.query.filter_by(user_id=user_id).all()
-        sims += EntryProfit.query.filter_by(user_id=user_id).all()
-        sims += EntryFixedIncome.query.filter_by(user_id=user_id).all()
-
-        # Ordena por created_at desc
-        simulations = sorted(sims, key=lambda s: getattr(s, 'created_at', None) or 0, reverse=True)
+        limit = min(
+            request.args.get('limit', current_app.config['HISTORY_PAGE_SIZE'], type=int),
+            current_app.config['HISTORY_MAX_PAGE_SIZE']
+        )
+        page = history_service.history_page(
+            user_id,
+            max(limit, 1),
+            after=request.args.get('after'),
+            before=request.args.get('before')
+        )
     except Exception as e:
         print(f"Erro ao buscar simulações: {e}")
         flash('Erro ao carregar histórico', 'error')
-    
-    return render_template('history/history.html', simulations=simulations, Type=type_enum.Type)
+
+    return render_template(
+        'history/history.html',
+        simulations=page['rows'],
+        next_cursor=page['next_cursor'],
+        prev_cursor=page['prev_cursor'],
+        # Só o limit pedido na URL é repassado aos links de página
+        limit=request.args.get('limit', type=int),
+        Type=type_enum.Type
+    )
 
 @login_required
 def profile():
@@ -100,29 +102,23 @@ def simulate_sac():
             principal_value, months, interest_rate
         )
 
-        type_obj = _get_or_create_type_from_enum(type_enum.Type.SAC)
-        new_sac = EntrySAC(
+        output_data = {
+            **stored_tables.storage_fields(
+                type_enum.Type.SAC, tabela, principal_value, months, interest_rate
+            ),
+            "total_interest": total_interest,
+            "total_amount": total_amount
+        }
+
+        _save_entry(
+            EntrySAC,
             user_id=user_id,
-            type_id=type_obj.id if type_obj else 1,
+            type_id=type_registry.get_type_id(type_enum.Type.SAC),
             principal_value=principal_value,
             interest_rate=interest_rate,
             months=months,
-
-            output_data={
-                "tabela": tabela,
-                "total_interest": total_interest,
-                "total_amount": total_amount
-            }
-        )
-        
-        db.session.add(new_sac)
-        db.session.commit()
-
-        # Agora chama o controller
-        tabela, total_interest, total_amount = calculator_controller.sac_system_calculation(
-            principal_value,
-            months,
-            interest_rate
+            output_data=output_data,
+            summary=build_summary(output_data)
         )
 
         return render_template(
@@ -154,27 +150,31 @@ def simulate_price():
         interest_rate = float(data.get('interest_rate', 0))
 
         # Calcula primeiro
+        engine = calculator_controller.resolve_engine(data)
         tabela, total_interest, total_amount = calculator_controller.price_system_calculation(
-            principal_value, months, interest_rate
+            principal_value, months, interest_rate, engine=engine
         )
 
+        output_data = {
+            **stored_tables.storage_fields(
+                type_enum.Type.PRICE, tabela, principal_value, months, interest_rate, engine
+            ),
+            "total_interest": total_interest,
+            "total_amount": total_amount
+        }
+
         user_id = session.get('user_id')
-        type_obj = _get_or_create_type_from_enum(type_enum.Type.PRICE)
 
-        new_entry = EntryPrice(
+        _save_entry(
+            EntryPrice,
             user_id=user_id,
-            type_id=type_obj.id if type_obj else 2,
+            type_id=type_registry.get_type_id(type_enum.Type.PRICE),
             principal_value=principal_value,
             interest_rate=interest_rate,
             months=months,
-            output_data={
-                "tabela": tabela,
-                "total_interest": total_interest,
-                "total_amount": total_amount
-            }
+            output_data=output_data,
+            summary=build_summary(output_data)
         )
-        db.session.add(new_entry)
-        db.session.commit()
 
         return render_template(
             "dashboard.html",
@@ -203,27 +203,31 @@ def simulate_credit():
         months = int(data.get('months', 0))
         interest_rate = float(data.get('interest_rate', 0))
 
+        engine = calculator_controller.resolve_engine(data)
         tabela, total_interest, total_amount = calculator_controller.credit_system_calculation(
-            principal_value, months, interest_rate
+            principal_value, months, interest_rate, engine=engine
         )
 
+        output_data = {
+            **stored_tables.storage_fields(
+                type_enum.Type.CREDIT, tabela, principal_value, months, interest_rate, engine
+            ),
+            "total_interest": total_interest,
+            "total_amount": total_amount
+        }
+
         user_id = session.get('user_id')
-        type_obj = _get_or_create_type_by_name('Crédito')
 
-        new_entry = EntryCredit(
+        _save_entry(
+            EntryCredit,
             user_id=user_id,
-            type_id=type_obj.id if type_obj else 3,
+            type_id=type_registry.get_type_id(type_enum.Type.CREDIT),
             principal_value=principal_value,
             interest_rate=interest_rate,
             months=months,
-            output_data={
-                "tabela": tabela,
-                "total_interest": total_interest,
-                "total_amount": total_amount
-            }
+            output_data=output_data,
+            summary=build_summary(output_data)
         )
-        db.session.add(new_entry)
-        db.session.commit()
 
         return render_template(
             "dashboard.html",
@@ -266,20 +270,17 @@ def simulate_profit():
 
         # Salva a simulação de lucro
         user_id = session.get('user_id')
-        # Garante existência do tipo Lucro
-        type_obj = _get_or_create_type_by_name('Lucro', 'Simulação de resultado de um negócio (lucro)')
-        type_id = type_obj.id if type_obj else 5
-        new_entry = EntryProfit(
+        _save_entry(
+            EntryProfit,
             user_id=user_id,
-            type_id=type_id,
+            type_id=type_registry.get_type_id(type_enum.Type.PROFIT),
             revenue=revenue,
             fixed_costs=fixed_costs,
             variable_costs=variable_costs,
             taxes=taxes,
-            output_data=result
+            output_data=result,
+            summary=build_summary(result)
         )
-        db.session.add(new_entry)
-        db.session.commit()
 
         return render_template(
             "dashboard.html",
@@ -306,31 +307,34 @@ def simulate_cet():
         taxes = float(data.get('taxes', 0))
 
         # Calcula antes de salvar
-        tabela, total_costs, cet_percent = calculator_controller.cet_calculation(
-            principal_value, months, interest_rate, admin_fees, insurance, taxes
+        tabela, total_costs, cet_monthly, cet_percent = calculator_controller.cet_calculation(
+            principal_value, months, interest_rate, admin_fees, insurance, taxes,
+            engine=calculator_controller.resolve_engine(data)
         )
 
+        output_data = {
+            "tabela": table_format.for_storage(tabela),
+            "total_costs": total_costs,
+            "cet_percent": cet_percent,
+            "cet_monthly": cet_monthly,
+            "total_amount": principal_value + total_costs
+        }
+
         user_id = session.get('user_id')
-        type_obj = _get_or_create_type_by_name('CET')
 
-        new_entry = EntryCET(
+        _save_entry(
+            EntryCET,
             user_id=user_id,
-            type_id=type_obj.id if type_obj else 4,
+            type_id=type_registry.get_type_id(type_enum.Type.CET),
             principal_value=principal_value,
             interest_rate=interest_rate,
             months=months,
             admin_fees=admin_fees,
             insurance=insurance,
             taxes=taxes,
-            output_data={
-                "tabela": tabela,
-                "total_costs": total_costs,
-                "cet_percent": cet_percent,
-                "total_amount": principal_value + total_costs
-            }
+            output_data=output_data,
+            summary=build_summary(output_data)
         )
-        db.session.add(new_entry)
-        db.session.commit()
 
         return render_template(
             "dashboard.html",
@@ -346,7 +350,8 @@ def simulate_cet():
             montante=f"{(principal_value + total_costs):,.2f}",
             prazo=months,
             taxa_juros=interest_rate,
-            cet_percent=cet_percent
+            cet_percent=cet_percent,
+            cet_monthly=cet_monthly
         )
     except Exception as e:
         db.session.rollback()
@@ -399,14 +404,21 @@ def view_simulation(type_id, simulation_id):
             flash("Tipo de simulação inválido", "error")
             return redirect(url_for('main.history'))
         
-        simulation = Model.query.get(simulation_id)
+        simulation = Model.query.options(undefer(Model.output_data)).get(simulation_id)
 
         if not simulation:
             flash('Simulação não encontrada ou excluída.', 'error')
             return history()
 
-        # O template simulation_detail.html usará simulation.output_data
-        return render_template('history/details.html', simulation=simulation)
+        # Gravada em linhas, em colunas ou recalculada a partir das entradas
+        try:
+            tabela = stored_tables.load_table(type_enum.Type(type_id), simulation)
+        except stored_tables.EngineVersionMismatch as e:
+            current_app.logger.warning(str(e))
+            flash('A tabela desta simulação foi gravada com outra versão do motor de cálculo '
+                  'e não pode ser reconstruída; os totais abaixo são os originais.', 'warning')
+            tabela = []
+        return render_template('history/details.html', simulation=simulation, tabela=tabela)
 
     except Exception as e:
         print(f"Erro ao visualizar simulação {simulation_id}: {e}")
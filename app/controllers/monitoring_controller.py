@@ -0,0 +1,19 @@
+from flask import Response, current_app, jsonify
+from ..services import metrics
+from ..services.db_pool import pool_status
+
+
+def pool_status_api():
+    """Estado do pool de conexões e estatísticas de checkout/espera"""
+    try:
+        return jsonify(pool_status()), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+def metrics_api():
+    """Histogramas de latência, tamanhos e status por endpoint (texto Prometheus)"""
+    registry = current_app.extensions.get('metrics')
+    if registry is None:
+        return jsonify({'error': 'Métricas desativadas (METRICS_ENABLED)'}), 404
+    return Response(registry.render(), content_type=metrics.CONTENT_TYPE)
@@ -1,5 +1,8 @@
-from flask import Blueprint, request, jsonify
-from ..models import db, TypeOperation, EntrySAC, EntryPrice, EntryCredit, EntryCET, EntryProfit, EntryFixedIncome
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+from sqlalchemy.exc import IntegrityError
+from ..models import db, TypeOperation
+from ..services import listing, type_registry
+from ..services import operations as operations_service
 
 def get_all_types():
     """Lista todos os tipos de operação"""
@@ -31,35 +34,57 @@ def get_type_by_id(type_id):
         return jsonify({'error': str(e)}), 500
 
 def get_operations_by_type(type_id):
-    """Lista operações por tipo"""
+    """Lista as operações de um tipo consultando só a tabela desse tipo.
+
+    Filtros: `user_id`, `from`/`to` (datas ISO) e `fields`. Com `limit` ou
+    `after` devolve uma página e `next_cursor`; sem eles, transmite todas as
+    operações em JSON (ou NDJSON com `format=ndjson`) sem montar a lista.
+    """
     try:
-        ops = []
-        ops += EntrySAC.query.filter_by(type_id=type_id).all()
-        ops += EntryPrice.query.filter_by(type_id=type_id).all()
-        ops += EntryCredit.query.filter_by(type_id=type_id).all()
-        ops += EntryCET.query.filter_by(type_id=type_id).all()
-        ops += EntryProfit.query.filter_by(type_id=type_id).all()
-        ops += EntryFixedIncome.query.filter_by(type_id=type_id).all()
+        kind = type_registry.get_kind(type_id)
+        if kind is None:
+            if TypeOperation.query.get(type_id) is None:
+                return jsonify({'error': 'Tipo não encontrado'}), 404
+            return jsonify({'operations': []}), 200
+        Model = operations_service.model_for_type(kind)
 
-        result = []
-        for op in ops:
-            item = {
-                'id': op.id,
-                'user_id': op.user_id,
-                'created_at': op.created_at.isoformat()
-            }
-            # Campos comuns quando presentes
-            if hasattr(op, 'principal_value'):
-                item['principal_value'] = float(op.principal_value)
-            if hasattr(op, 'interest_rate'):
-                item['interest_rate'] = float(op.interest_rate)
-            if hasattr(op, 'months'):
-                item['months'] = op.months
-            if hasattr(op, 'revenue'):
-                item['revenue'] = float(op.revenue)
+        fields = listing.parse_fields(
+            request.args.get('fields'),
+            operations_service.allowed_fields(Model),
+            operations_service.default_fields(Model)
+        )
+        after = request.args.get('after')
+        query = operations_service.operations_query(
+            Model, type_id, fields,
+            user_id=operations_service.parse_user_id(request.args.get('user_id')),
+            date_from=operations_service.parse_date(request.args.get('from')),
+            date_to=operations_service.parse_date(request.args.get('to'), end=True),
+            after=operations_service.decode_cursor(after) if after else None
+        )
 
-            result.append(item)
-        return jsonify({'operations': result}), 200
+        if listing.wants_ndjson(request):
+            rows = operations_service.iter_operations(query)
+            lines = listing.ndjson_lines(listing.row_to_dict(row, fields) for row in rows)
+            return Response(stream_with_context(lines), mimetype=listing.NDJSON_MIMETYPE)
+
+        if 'limit' in request.args or after:
+            limit = min(
+                request.args.get('limit', current_app.config['OPERATIONS_PAGE_SIZE'], type=int),
+                current_app.config['OPERATIONS_MAX_PAGE_SIZE']
+            )
+            page = operations_service.operations_page(query, max(limit, 1))
+            return jsonify({
+                'operations': [listing.row_to_dict(row, fields) for row in page['rows']],
+                'next_cursor': page['next_cursor']
+            }), 200
+
+        rows = operations_service.iter_operations(query)
+        chunks = listing.json_object_stream(
+            'operations', (listing.row_to_dict(row, fields) for row in rows)
+        )
+        return Response(stream_with_context(chunks), mimetype='application/json')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -78,12 +103,16 @@ def create_type():
         
         db.session.add(type_op)
         db.session.commit()
+        type_registry.invalidate()
         
         return jsonify({
             'message': 'Tipo criado com sucesso',
             'id': type_op.id
         }), 201
         
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'error': 'Já existe um tipo com esse nome'}), 409
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -1,19 +1,38 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
 from ..models import db, User
+from ..services import listing
+from ..services import users as users_service
 
 def get_all_users():
-    """Lista todos os usuários"""
+    """Lista usuários paginados por cursor (`limit`, `after`) com `fields` opcionais.
+
+    Com `format=ndjson` (ou Accept: application/x-ndjson) transmite todos os
+    usuários a partir de `after`, um JSON por linha, sem montar a lista.
+    """
     try:
-        users = User.query.all()
-        result = []
-        for user in users:
-            result.append({
-                'id': user.id,
-                'name': user.name,
-                'email': user.email,
-                'created_at': user.created_at.isoformat()
-            })
-        return jsonify({'users': result}), 200
+        fields = listing.parse_fields(
+            request.args.get('fields'),
+            users_service.USER_FIELDS,
+            users_service.DEFAULT_USER_FIELDS
+        )
+        after = request.args.get('after', type=int)
+
+        if listing.wants_ndjson(request):
+            rows = users_service.iter_users(fields, after)
+            lines = listing.ndjson_lines(listing.row_to_dict(row, fields) for row in rows)
+            return Response(stream_with_context(lines), mimetype=listing.NDJSON_MIMETYPE)
+
+        limit = min(
+            request.args.get('limit', current_app.config['USERS_PAGE_SIZE'], type=int),
+            current_app.config['USERS_MAX_PAGE_SIZE']
+        )
+        page = users_service.users_page(fields, max(limit, 1), after)
+        return jsonify({
+            'users': [listing.row_to_dict(row, fields) for row in page['rows']],
+            'next_cursor': page['next_cursor']
+        }), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -2,6 +2,11 @@ from flask_sqlalchemy import SQLAlchemy
 
 db = SQLAlchemy()
 
+# BIGINT no MySQL; no SQLite só INTEGER PRIMARY KEY é autoincremento
+BigIntegerId = db.BigInteger().with_variant(db.Integer(), "sqlite")
+
+from .compressed_json import CompressedJSON
+
 from .user import User
 from .type_operation import TypeOperation
 from .entry_sac import EntrySAC
@@ -10,3 +15,14 @@ from .entry_credit import EntryCredit
 from .entry_profit import EntryProfit
 from .entry_cet import EntryCET
 from .entry_fixed_income import EntryFixedIncome
+from .type_enum import Type
+
+# Tabela de entrada de cada tipo de simulação
+ENTRY_MODELS = {
+    Type.SAC: EntrySAC,
+    Type.PRICE: EntryPrice,
+    Type.CREDIT: EntryCredit,
+    Type.PROFIT: EntryProfit,
+    Type.CET: EntryCET,
+    Type.FIXED_INCOME: EntryFixedIncome,
+}
@@ -0,0 +1,101 @@
+"""Tipo de coluna JSON comprimido para o `output_data` das tabelas `entry_*`.
+
+O valor é gravado como BLOB: um byte com o codec seguido do JSON
+comprimido. Valores sem esse prefixo são JSON puro, que é o que as linhas
+antigas contêm depois que `flask setup-db` (ou `init_db.py --upgrade`)
+converte a coluna; eles continuam legíveis e são comprimidos na próxima
+gravação.
+
+A descompressão acontece ao carregar a coluna. Como ela é `deferred` nos
+models, as consultas comuns nem a selecionam; as que usam
+`undefer(output_data)` descomprimem todas as linhas já no carregamento.
+
+zlib vem da biblioteca padrão; zstd usa o pacote opcional `zstandard` e,
+se ele não estiver instalado, a gravação cai para zlib.
+"""
+import json
+import logging
+import zlib
+
+from sqlalchemy.dialects import mysql
+from sqlalchemy.types import LargeBinary, TypeDecorator
+
+try:
+    import zstandard
+except ImportError:  # dependência opcional
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+CODECS = ('none', 'zlib', 'zstd')
+_ZLIB = b'\x01'
+_ZSTD = b'\x02'
+
+# Abaixo disso o ganho não compensa o custo (ex.: resultados de lucro)
+MIN_COMPRESS_BYTES = 256
+
+_settings = {'codec': 'zlib', 'level': 6}
+
+
+def configure(codec='zlib', level=6):
+    """Codec e nível usados nas gravações (OUTPUT_COMPRESSION/_LEVEL)."""
+    if codec not in CODECS:
+        raise ValueError(f"OUTPUT_COMPRESSION inválido: {codec} (use {', '.join(CODECS)})")
+    if codec == 'zstd' and zstandard is None:
+        logger.warning("OUTPUT_COMPRESSION=zstd sem o pacote zstandard: usando zlib")
+        codec = 'zlib'
+    _settings.update(codec=codec, level=int(level))
+
+
+def compress(value):
+    """Objeto -> bytes gravados na coluna."""
+    raw = json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    codec, level = _settings['codec'], _settings['level']
+    if codec == 'none' or len(raw) < MIN_COMPRESS_BYTES:
+        return raw
+    if codec == 'zstd':
+        return _ZSTD + zstandard.ZstdCompressor(level=level).compress(raw)
+    return _ZLIB + zlib.compress(raw, level)
+
+
+def decompress_raw(data):
+    """Bytes da coluna -> JSON em bytes (aceita JSON puro legado)."""
+    if isinstance(data, str):
+        return data.encode('utf-8')
+    data = bytes(data)
+    if data[:1] == _ZLIB:
+        return zlib.decompress(data[1:])
+    if data[:1] == _ZSTD:
+        if zstandard is None:
+            raise RuntimeError("output_data comprimido com zstd: instale o pacote zstandard")
+        return zstandard.ZstdDecompressor().decompress(data[1:])
+    return data
+
+
+def is_compressed(data):
+    return isinstance(data, (bytes, bytearray, memoryview)) and bytes(data[:1]) in (_ZLIB, _ZSTD)
+
+
+class CompressedJSON(TypeDecorator):
+    """JSON gravado comprimido num BLOB (LONGBLOB no MySQL)."""
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == 'mysql':
+            return dialect.type_descriptor(mysql.LONGBLOB())
+        return dialect.type_descriptor(LargeBinary())
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return compress(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, (dict, list)):
+            # Coluna ainda JSON no banco: o driver já decodificou
+            return value
+        return json.loads(decompress_raw(value))
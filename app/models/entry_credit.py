@@ -1,22 +1,28 @@
 from datetime import datetime
-from . import db
+from . import db, BigIntegerId, CompressedJSON
 from sqlalchemy import JSON
 
 class EntryCredit(db.Model):
     __tablename__ = 'entry_credit'
     
-    id = db.Column(db.BigInteger, primary_key=True)
+    id = db.Column(BigIntegerId, primary_key=True)
     user_id = db.Column(db.BigInteger, db.ForeignKey('users.id'), nullable=False)
     type_id = db.Column(db.Integer, db.ForeignKey('type_operations.id'), nullable=False)
     
     principal_value = db.Column(db.Numeric(15, 2), nullable=False)
     interest_rate = db.Column(db.Numeric(5, 2), nullable=False)
     months = db.Column(db.Integer, nullable=False)
-    output_data = db.Column(JSON)
+    output_data = db.deferred(db.Column(CompressedJSON))
+    summary = db.Column(JSON)
     created_at = db.Column(db.DateTime, default=datetime.now)
     updated_at = db.Column(db.DateTime, default=datetime.now)
     deleted_at = db.Column(db.DateTime, nullable=True)
 
+    __table_args__ = (
+        db.Index('ix_entry_credit_user_created', user_id, created_at.desc(), id),
+        db.Index('ix_entry_credit_type_created', type_id, created_at),
+    )
+
     user = db.relationship('User')
     type_operation = db.relationship('TypeOperation')
 
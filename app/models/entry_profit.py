@@ -1,11 +1,11 @@
 from datetime import datetime
-from . import db
+from . import db, BigIntegerId, CompressedJSON
 from sqlalchemy import JSON
 
 class EntryProfit(db.Model):
     __tablename__ = 'entry_profit'
     
-    id = db.Column(db.BigInteger, primary_key=True)
+    id = db.Column(BigIntegerId, primary_key=True)
     user_id = db.Column(db.BigInteger, db.ForeignKey('users.id'), nullable=False)
     type_id = db.Column(db.Integer, db.ForeignKey('type_operations.id'), nullable=False)
     
@@ -13,11 +13,17 @@ class EntryProfit(db.Model):
     fixed_costs = db.Column(db.Numeric(15, 2), nullable=False)
     variable_costs = db.Column(db.Numeric(15, 2), nullable=False)
     taxes = db.Column(db.Numeric(15, 2), nullable=False)
-    output_data = db.Column(JSON)
+    output_data = db.deferred(db.Column(CompressedJSON))
+    summary = db.Column(JSON)
     created_at = db.Column(db.DateTime, default=datetime.now)
     updated_at = db.Column(db.DateTime, default=datetime.now)
     deleted_at = db.Column(db.DateTime, nullable=True)
 
+    __table_args__ = (
+        db.Index('ix_entry_profit_user_created', user_id, created_at.desc(), id),
+        db.Index('ix_entry_profit_type_created', type_id, created_at),
+    )
+
     user = db.relationship('User')
     type_operation = db.relationship('TypeOperation')
 
@@ -1,10 +1,10 @@
 from datetime import datetime
-from . import db
+from . import db, BigIntegerId, CompressedJSON
 from sqlalchemy import JSON
 
 class EntrySAC(db.Model):
     __tablename__ = 'entry_sac'
-    id = db.Column(db.BigInteger, primary_key=True)
+    id = db.Column(BigIntegerId, primary_key=True)
     user_id = db.Column(db.BigInteger, db.ForeignKey('users.id'), nullable=False)
     type_id = db.Column(db.Integer, db.ForeignKey('type_operations.id'), nullable=False)
     principal_value = db.Column(db.Numeric(15, 2), nullable=False)
@@ -12,11 +12,17 @@ class EntrySAC(db.Model):
     months = db.Column(db.Integer, nullable=False)
     is_monthly = db.Column(db.Boolean, default=True)
     start_date = db.Column(db.Date, nullable=True)
-    output_data = db.Column(JSON)
+    output_data = db.deferred(db.Column(CompressedJSON))
+    summary = db.Column(JSON)
     created_at = db.Column(db.DateTime, default=datetime.now)
     updated_at = db.Column(db.DateTime, default=datetime.now)
     deleted_at = db.Column(db.DateTime, nullable=True)
 
+    __table_args__ = (
+        db.Index('ix_entry_sac_user_created', user_id, created_at.desc(), id),
+        db.Index('ix_entry_sac_type_created', type_id, created_at),
+    )
+
     user = db.relationship('User', back_populates='operations')
     type_operation = db.relationship('TypeOperation', back_populates='entries')
 
@@ -32,23 +38,39 @@ class EntrySAC(db.Model):
 
     @staticmethod
     def calculate_total_interest(principal_value, months, interest_rate):
-        """Cálculo total dos juros em um financiamento SAC"""
-        total_interest = 0
+        """Cálculo total dos juros em um financiamento SAC.
+
+        Os saldos caem em progressão aritmética, então a soma dos juros tem
+        forma fechada: r * P * (n + 1) / 2.
+        """
+        r = interest_rate / 100
+        return round(r * principal_value * (months + 1) / 2, 2)
+
+    @staticmethod
+    def calculate_payment_at(principal_value, months, interest_rate, month):
+        """Prestação do mês `month` (1 a `months`) sem percorrer os meses anteriores"""
+        if not 1 <= month <= months:
+            raise ValueError(f"Mês fora do prazo: {month}")
         amortization = principal_value / months
-        for _ in range(months):
-            interest_frame = principal_value * (interest_rate / 100)
-            total_interest += interest_frame
-            principal_value -= amortization
-        return round(total_interest, 2)
+        saldo = principal_value - (month - 1) * amortization
+        return round(amortization + saldo * (interest_rate / 100), 2)
 
     @staticmethod
     def calculate_payments(principal_value, months, interest_rate):
         """Gera a lista de prestações (amortização + juros)"""
-        payments = []
-        amortization = principal_value / months
-        for _ in range(months):
-            interest_frame = principal_value * (interest_rate / 100)
-            payment = amortization + interest_frame
-            payments.append(round(payment, 2))
-            principal_value -= amortization
-        return payments
+        return [
+            EntrySAC.calculate_payment_at(principal_value, months, interest_rate, month)
+            for month in range(1, months + 1)
+        ]
+
+    @staticmethod
+    def calculate_summary(principal_value, months, interest_rate):
+        """Totais do SAC em O(1): juros, montante e primeira/última prestação"""
+        total_interest = EntrySAC.calculate_total_interest(principal_value, months, interest_rate)
+        return {
+            "amortization": EntrySAC.calculate_amortization(principal_value, months),
+            "first_payment": EntrySAC.calculate_payment_at(principal_value, months, interest_rate, 1),
+            "last_payment": EntrySAC.calculate_payment_at(principal_value, months, interest_rate, months),
+            "total_interest": total_interest,
+            "total_amount": principal_value + total_interest,
+        }
@@ -4,6 +4,10 @@ from . import db
 class TypeOperation(db.Model):
     __tablename__ = 'type_operations'
 
+    __table_args__ = (
+        db.UniqueConstraint('name', name='uq_type_operations_name'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text)
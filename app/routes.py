@@ -1,6 +1,6 @@
 from flask import Blueprint, request
 from .models import db
-from .controllers import auth_controller, calculator_controller, main_controller, type_operation_controller, user_controller
+from .controllers import auth_controller, calculator_controller, main_controller, monitoring_controller, type_operation_controller, user_controller
 
 # Blueprint para páginas principais
 main_bp = Blueprint('main', __name__)
@@ -74,6 +74,22 @@ def get_operations_by_type(type_id):
 def create_type():
     return type_operation_controller.create_type()
 
+# -------------------- CALCULATOR (API) --------------------
+
+@api_bp.route('/calculator/cache', methods=['GET'])
+def calculator_cache_stats():
+    return calculator_controller.cache_stats_api()
+
+# -------------------- MONITORING (API) --------------------
+
+@api_bp.route('/db/pool', methods=['GET'])
+def db_pool_status():
+    return monitoring_controller.pool_status_api()
+
+@main_bp.route('/metrics', methods=['GET'])
+def metrics():
+    return monitoring_controller.metrics_api()
+
 # -------------------- MAIN PAGES ---------------------
 
 @main_bp.route('/', methods=['GET'])
@@ -164,6 +180,18 @@ def update_settings():
 def sac_system_calculation():
     return calculator_controller.sac_system_api()
 
+@main_bp.route('/calculator/batch', methods=['POST'])
+def batch_simulation():
+    return calculator_controller.batch_simulation_api()
+
+@main_bp.route('/calculator/price/grid', methods=['POST'])
+def price_grid():
+    return calculator_controller.price_grid_api()
+
+@main_bp.route('/calculator/fixed-income/monte-carlo', methods=['POST'])
+def fixed_income_monte_carlo():
+    return calculator_controller.fixed_income_monte_carlo_api()
+
 # ------------------ BLUEPRINT REGISTER ----------------
 
 def register_routes(app):
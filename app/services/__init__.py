@@ -0,0 +1,33 @@
+import importlib
+import sys
+import threading
+
+
+class _LazyModule:
+    """Representante de um módulo que só é importado no primeiro acesso a um atributo.
+
+    O `importlib.util.LazyLoader` do Python 3.11 troca a classe do módulo
+    antes de executá-lo, então uma segunda thread pode ver o módulo pela
+    metade; aqui o primeiro import é feito sob um lock.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def __getattr__(self, attr):
+        module = self._module
+        if module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+                module = self._module
+        return getattr(module, attr)
+
+
+def lazy_import(name):
+    """Módulo cujo código só executa no primeiro acesso a um atributo."""
+    if name in sys.modules:
+        return sys.modules[name]
+    return _LazyModule(name)
@@ -0,0 +1,160 @@
+"""Resumos vetorizados para lotes de cenários.
+
+Os cenários de um mesmo tipo são agrupados em arrays NumPy. O SAC e a
+prestação PRICE saem das fórmulas fechadas numa única passada; os juros da
+PRICE (e do crédito e do CET) e da renda fixa são arredondados mês a mês nas
+tabelas, então esses totais percorrem a recorrência do motor para bater com
+a tabela do mesmo cenário.
+"""
+import numpy as np
+
+from ..models.type_enum import Type
+from .irr import cet_rates
+from .metrics import timed
+from .schedules import (
+    FIXED_INCOME_ENGINES, PRICE_ENGINES, price_installment, round2, running_total
+)
+
+BATCH_TYPES = (Type.SAC, Type.PRICE, Type.CREDIT, Type.CET, Type.FIXED_INCOME)
+
+# Um passo vetorizado custa cerca de 24 meses do laço escalar de price_columns
+VECTOR_STEP_COST = 24
+
+
+def sac_summaries(principal, months, rate):
+    """Totais SAC em forma fechada (mesmas fórmulas de EntrySAC)"""
+    r = rate / 100
+    amortization = principal / months
+    total_interest = round2(r * principal * (months + 1) / 2)
+    first_payment = amortization + principal * r
+    last_payment = amortization + (principal - (months - 1) * amortization) * r
+    return {
+        "amortization": round2(amortization).tolist(),
+        "first_payment": round2(first_payment).tolist(),
+        "last_payment": round2(last_payment).tolist(),
+        "total_interest": total_interest.tolist(),
+        "total_amount": (principal + total_interest).tolist(),
+    }
+
+
+def _price_interest_float(principal, months, rate, installment):
+    """Juros somados da recorrência do motor "float", com todos os cenários juntos.
+
+    Cada passo repete, elemento a elemento, as mesmas operações de
+    `price_columns` (o `round2` é idêntico ao `round` do Python); cenários já
+    encerrados ficam congelados pela máscara.
+    """
+    r = rate / 100.0
+    saldo = principal.copy()
+    total = np.zeros_like(principal)
+    for i in range(int(months.max(initial=0))):
+        active = i < months
+        juros = round2(saldo * r)
+        amortizacao = round2(installment - juros)
+        novo_saldo = round2(saldo - amortizacao)
+        saldo = np.where(active, np.where(novo_saldo < 0, 0.0, novo_saldo), saldo)
+        total = np.where(active, total + juros, total)
+    return round2(total).tolist()
+
+
+def price_total_interest(principal, months, rate, installment, engine="float"):
+    """Juros totais PRICE de cada cenário, iguais aos da tabela do motor.
+
+    A forma fechada n * prestação - P ignora o arredondamento de cada linha
+    (e a última prestação ajustada do motor "cents"), então diverge da tabela.
+    Com poucos cenários o laço escalar sai mais barato que os passos vetorizados.
+    """
+    if engine == "float" and months.sum() > VECTOR_STEP_COST * months.max(initial=0):
+        return _price_interest_float(principal, months, rate, np.asarray(installment, dtype=float))
+    columns = PRICE_ENGINES[engine]
+    return [
+        round(running_total(columns(p, n, r)["juros"]), 2)
+        for p, n, r in zip(principal.tolist(), months.tolist(), rate.tolist())
+    ]
+
+
+def price_summaries(principal, months, rate, engine="float"):
+    """Prestação e totais PRICE, iguais aos de `price_system_calculation`"""
+    installment = [
+        price_installment(p, n, r) for p, n, r in zip(principal.tolist(), months.tolist(), rate.tolist())
+    ]
+    total_interest = price_total_interest(principal, months, rate, installment, engine)
+    return {
+        "installment": installment,
+        "total_interest": total_interest,
+        "total_amount": [round(p + j, 2) for p, j in zip(principal.tolist(), total_interest)],
+    }
+
+
+def cet_summaries(principal, months, rate, fees, engine="float"):
+    """Custo total (juros PRICE + tarifas) e CET mensal/anual pela TIR, todos de uma vez"""
+    price = price_summaries(principal, months, rate, engine)
+    total_costs = [round(j + f, 2) for j, f in zip(price["total_interest"], fees.tolist())]
+    cet_monthly, cet_annual = cet_rates(principal, months, price["installment"], fees)
+    return {
+        "installment": price["installment"],
+        "total_costs": total_costs,
+        "cet_monthly": cet_monthly,
+        "cet_percent": cet_annual,
+        "total_amount": (principal + np.array(total_costs)).tolist(),
+    }
+
+
+def fixed_income_summaries(principal, months, rate, engine="float"):
+    """Montante final da renda fixa pelo mesmo motor da tabela.
+
+    A forma fechada P * (1 + r)^n arredonda só no fim e diverge em centavos
+    da tabela, que arredonda os juros de cada mês; por isso cada cenário
+    passa pela mesma recorrência de `fixed_income_simulation`.
+    """
+    columns = FIXED_INCOME_ENGINES[engine]
+    total_interest, total_amount = [], []
+    for p, n, r in zip(principal.tolist(), months.tolist(), rate.tolist()):
+        saldo = float(columns(p, n, r)["saldo"][-1]) if n > 0 else p
+        total_interest.append(round(saldo - p, 2))
+        total_amount.append(saldo)
+    return {
+        "total_interest": total_interest,
+        "total_amount": total_amount,
+    }
+
+
+@timed('calculator')
+def summarize(kind, principal, months, rate, fees=None, engine="float"):
+    """Resolve um grupo de cenários do mesmo tipo e devolve um dict por cenário.
+
+    `engine` é o motor das tabelas PRICE/renda fixa que os totais reproduzem.
+    """
+    principal = np.asarray(principal, dtype=float)
+    months = np.asarray(months, dtype=np.int64)
+    rate = np.asarray(rate, dtype=float)
+
+    if kind is Type.SAC:
+        columns = sac_summaries(principal, months, rate)
+    elif kind in (Type.PRICE, Type.CREDIT):
+        columns = price_summaries(principal, months, rate, engine)
+    elif kind is Type.CET:
+        columns = cet_summaries(principal, months, rate, np.asarray(fees, dtype=float), engine)
+    elif kind is Type.FIXED_INCOME:
+        columns = fixed_income_summaries(principal, months, rate, engine)
+    else:
+        raise ValueError(f"Tipo não suportado em lote: {kind.name}")
+
+    keys = list(columns)
+    return [dict(zip(keys, row)) for row in zip(*(columns[key] for key in keys))]
+
+
+@timed('calculator')
+def price_grid(principal, rates, terms, engine="float"):
+    """Prestação e juros totais PRICE para o produto cartesiano taxa x prazo.
+
+    Linhas são taxas e colunas são prazos. Os juros de cada célula vêm da
+    recorrência do motor, como em `price_system_calculation`.
+    """
+    rate, months = np.meshgrid(np.asarray(rates, dtype=float), np.asarray(terms, dtype=np.int64), indexing="ij")
+    principal = np.full(rate.shape, float(principal))
+    summaries = price_summaries(principal.ravel(), months.ravel(), rate.ravel(), engine)
+    return {
+        key: np.array(summaries[key]).reshape(rate.shape).tolist()
+        for key in ("installment", "total_interest")
+    }
@@ -0,0 +1,109 @@
+"""Cache LRU/TTL local ao processo para os resultados das calculadoras.
+
+Os valores guardados são congelados (listas viram tuplas e dicts viram
+`FrozenRow`), então um acerto pode devolver o mesmo objeto sem cópia profunda.
+"""
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+
+class FrozenRow(dict):
+    """Dict somente leitura; continua serializável por `json` e pelo Jinja."""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Resultados em cache são imutáveis")
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = __ior__ = _readonly
+
+
+def freeze(value):
+    """Congela recursivamente listas, tuplas e dicts."""
+    if isinstance(value, FrozenRow):
+        return value
+    if isinstance(value, dict):
+        return FrozenRow((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+class LRUCache:
+    """Cache com limite de entradas (LRU) e expiração opcional (TTL, em segundos)."""
+
+    def __init__(self, maxsize=128, ttl=0):
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def configure(self, maxsize, ttl):
+        """Ajusta limites (chamado no create_app) e descarta o excedente."""
+        with self._lock:
+            self.maxsize = maxsize
+            self.ttl = ttl
+            self._evict()
+
+    def get(self, key):
+        """Retorna (encontrado, valor) e atualiza os contadores."""
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                expires_at, value = item
+                if not expires_at or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                del self._data[key]
+                self.expirations += 1
+            self.misses += 1
+            return False, None
+
+    def set(self, key, value):
+        if self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl else 0
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            self._evict()
+
+    def _evict(self):
+        while len(self._data) > max(self.maxsize, 0):
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def memoize(self, func):
+        """Decorator: guarda o resultado congelado de `func` por argumentos."""
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (func.__qualname__, args, tuple(sorted(kwargs.items())))
+            found, value = self.get(key)
+            if found:
+                return value
+            value = freeze(func(*args, **kwargs))
+            self.set(key, value)
+            return value
+        return wrapper
+
+
+calculator_cache = LRUCache()
@@ -0,0 +1,140 @@
+"""Pool de conexões: opções do engine, descarte após fork e estatísticas.
+
+O pool é um `QueuePool` que mede quanto tempo cada checkout esperou. As
+contagens de conexões, checkouts, checkins e invalidações vêm dos eventos do
+próprio pool e ficam no `PoolStats` de cada app (`app.extensions['pool_stats']`).
+"""
+import os
+import threading
+import time
+import weakref
+
+from flask import current_app
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+from ..models import db
+
+
+class PoolStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.connects = self.checkouts = self.checkins = self.invalidations = 0
+            self.wait_total = self.wait_max = 0.0
+            self.timeouts = 0
+
+    def record(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def record_wait(self, seconds, timed_out=False):
+        with self._lock:
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                'connects': self.connects,
+                'checkouts': self.checkouts,
+                'checkins': self.checkins,
+                'invalidations': self.invalidations,
+                'timeouts': self.timeouts,
+                'wait_total_ms': round(self.wait_total * 1000, 3),
+                'wait_avg_ms': round(self.wait_total * 1000 / self.checkouts, 3) if self.checkouts else 0.0,
+                'wait_max_ms': round(self.wait_max * 1000, 3),
+            }
+
+
+# Engines dos apps criados neste processo, descartados no filho após fork
+_engines = weakref.WeakSet()
+
+
+def _dispose_after_fork():
+    # Conexões abertas antes do fork (ex.: gunicorn --preload) não podem ser
+    # compartilhadas com o filho; close=False não fecha as do processo pai.
+    for engine in list(_engines):
+        engine.dispose(close=False)
+
+
+# Um único hook por processo: register_at_fork não tem como desregistrar
+os.register_at_fork(after_in_child=_dispose_after_fork)
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool que registra o tempo de espera de cada checkout."""
+
+    stats = None
+
+    def recreate(self):
+        # dispose() troca o pool por uma cópia; mantém as estatísticas do app
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            if self.stats is not None:
+                self.stats.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        except Exception:
+            if self.stats is not None:
+                self.stats.record_wait(time.perf_counter() - start)
+            raise
+        if self.stats is not None:
+            self.stats.record_wait(time.perf_counter() - start)
+        return connection
+
+
+def engine_options(app, config_class):
+    """SQLALCHEMY_ENGINE_OPTIONS com o pool da config (SQLite usa o pool padrão)."""
+    if app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+        return {}
+    options = config_class.build_engine_options()
+    options['poolclass'] = InstrumentedQueuePool
+    return options
+
+
+def _attach_events(engine, stats):
+    for name, counter in (
+        ('connect', 'connects'),
+        ('checkout', 'checkouts'),
+        ('checkin', 'checkins'),
+        ('invalidate', 'invalidations'),
+    ):
+        event.listen(engine, name, lambda *args, _counter=counter: stats.record(_counter))
+
+
+def init_pool(app):
+    """Liga os eventos do pool e inclui o engine no descarte após fork."""
+    stats = app.extensions['pool_stats'] = PoolStats()
+    with app.app_context():
+        engine = db.engine
+    if isinstance(engine.pool, InstrumentedQueuePool):
+        engine.pool.stats = stats
+    _attach_events(engine, stats)
+    _engines.add(engine)
+
+
+def pool_status():
+    """Estado atual do pool e contadores acumulados."""
+    pool = db.engine.pool
+    status = {'pool': type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            'size': pool.size(),
+            'checked_in': pool.checkedin(),
+            'checked_out': pool.checkedout(),
+            'overflow': pool.overflow(),
+        })
+    status.update(current_app.extensions['pool_stats'].as_dict())
+    return status
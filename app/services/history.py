@@ -0,0 +1,104 @@
+"""Consulta paginada do histórico de simulações.
+
+Um único UNION ALL sobre as seis tabelas `entry_*`, ordenado por
+(created_at, id, tipo) decrescente e paginado por cursor (keyset). Cada ramo
+do UNION já aplica o filtro do usuário, o cursor e o LIMIT, para que o banco
+use os índices de cada tabela em vez de ler o histórico inteiro. O
+`output_data` nunca é selecionado; os totais vêm da coluna `summary`.
+"""
+from datetime import datetime
+
+from sqlalchemy import and_, literal, null, or_, select, union_all
+
+from ..models import db, ENTRY_MODELS, EntryProfit
+
+
+def encode_cursor(row):
+    """Serializa a posição de uma linha do histórico para a query string."""
+    return f"{row.created_at.isoformat()}|{row.id}|{row.kind}"
+
+
+def decode_cursor(cursor):
+    """Inverso de `encode_cursor`: (created_at, id, kind)."""
+    created_at, entry_id, kind = cursor.split('|')
+    return datetime.fromisoformat(created_at), int(entry_id), int(kind)
+
+
+def _keyset_condition(Model, kind, cursor, forward):
+    """Filtro do ramo: linhas depois (forward) ou antes do cursor na ordenação."""
+    created_at, entry_id, cursor_kind = cursor
+    # O tipo desempata ids iguais em tabelas diferentes; como é constante
+    # no ramo, ele só decide se o id do cursor entra ou não.
+    if forward:
+        include_id = kind.value < cursor_kind
+        id_condition = Model.id <= entry_id if include_id else Model.id < entry_id
+        return or_(Model.created_at < created_at,
+                   and_(Model.created_at == created_at, id_condition))
+
+    include_id = kind.value > cursor_kind
+    id_condition = Model.id >= entry_id if include_id else Model.id > entry_id
+    return or_(Model.created_at > created_at,
+               and_(Model.created_at == created_at, id_condition))
+
+
+def _branch(kind, Model, user_id, cursor, forward, limit):
+    if Model is EntryProfit:
+        principal, rate, months = Model.revenue, null(), null()
+    else:
+        principal, rate, months = Model.principal_value, Model.interest_rate, Model.months
+
+    query = select(
+        literal(kind.value).label('kind'),
+        Model.id.label('id'),
+        Model.type_id.label('type_id'),
+        principal.label('principal_value'),
+        rate.label('interest_rate'),
+        months.label('months'),
+        Model.summary.label('summary'),
+        Model.created_at.label('created_at'),
+    ).where(Model.user_id == user_id)
+
+    if cursor:
+        query = query.where(_keyset_condition(Model, kind, cursor, forward))
+
+    if forward:
+        order = (Model.created_at.desc(), Model.id.desc())
+    else:
+        order = (Model.created_at.asc(), Model.id.asc())
+    return select(query.order_by(*order).limit(limit).subquery())
+
+
+def history_page(user_id, limit, after=None, before=None):
+    """Retorna uma página do histórico e os cursores de navegação.
+
+    `after` avança (simulações mais antigas) e `before` volta para as mais
+    recentes. O resultado é um dict com `rows`, `next_cursor` e `prev_cursor`.
+    """
+    forward = before is None
+    cursor = decode_cursor(after if forward else before) if (after or before) else None
+
+    union = union_all(*(
+        _branch(kind, Model, user_id, cursor, forward, limit + 1)
+        for kind, Model in ENTRY_MODELS.items()
+    )).subquery()
+
+    if forward:
+        order = (union.c.created_at.desc(), union.c.id.desc(), union.c.kind.desc())
+    else:
+        order = (union.c.created_at.asc(), union.c.id.asc(), union.c.kind.asc())
+
+    rows = db.session.execute(select(union).order_by(*order).limit(limit + 1)).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    if forward:
+        has_next, has_prev = has_more, after is not None
+    else:
+        rows.reverse()
+        has_next, has_prev = True, has_more
+
+    return {
+        'rows': rows,
+        'next_cursor': encode_cursor(rows[-1]) if rows and has_next else None,
+        'prev_cursor': encode_cursor(rows[0]) if rows and has_prev else None,
+    }
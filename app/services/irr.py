@@ -0,0 +1,109 @@
+"""Taxa interna de retorno (TIR) vetorizada, usada no cálculo do CET.
+
+Cada linha de `cashflows` é um cenário e cada coluna um mês (t = 0, 1, ...);
+cenários com prazos menores são completados com zeros. O solver é um Newton
+protegido: mantém, por cenário, um intervalo [lo, hi] com troca de sinal do
+VPL e recorre à bissecção sempre que o passo de Newton sai do intervalo.
+"""
+import numpy as np
+
+from .schedules import round2
+
+RATE_LOW = -0.5
+RATE_HIGH = 1.0
+
+
+def npv(rates, cashflows):
+    """VPL de cada cenário na taxa mensal correspondente."""
+    cashflows = np.atleast_2d(cashflows)
+    periods = np.arange(cashflows.shape[1])
+    discount = (1.0 + np.asarray(rates, dtype=float))[:, np.newaxis] ** -periods
+    return (cashflows * discount).sum(axis=1)
+
+
+def _npv_and_derivative(rates, cashflows, periods):
+    discount = (1.0 + rates)[:, np.newaxis] ** -periods
+    value = (cashflows * discount).sum(axis=1)
+    derivative = (-periods * cashflows * discount / (1.0 + rates)[:, np.newaxis]).sum(axis=1)
+    return value, derivative
+
+
+def solve_irr(cashflows, guess=0.01, tol=1e-12, max_iter=100):
+    """TIR mensal de cada linha de `cashflows`; NaN quando não há troca de sinal."""
+    cashflows = np.atleast_2d(np.asarray(cashflows, dtype=float))
+    periods = np.arange(cashflows.shape[1])
+    count = cashflows.shape[0]
+
+    lo = np.full(count, RATE_LOW)
+    hi = np.full(count, RATE_HIGH)
+    f_lo = npv(lo, cashflows)
+    f_hi = npv(hi, cashflows)
+    valid = np.sign(f_lo) * np.sign(f_hi) <= 0
+
+    rate = np.clip(np.broadcast_to(np.asarray(guess, dtype=float), (count,)).copy(), lo, hi)
+    scale = np.abs(cashflows).sum(axis=1) + 1.0
+    active = valid.copy()
+
+    for _ in range(max_iter):
+        if not active.any():
+            break
+        value, derivative = _npv_and_derivative(rate, cashflows, periods)
+
+        # Atualiza o intervalo mantendo a troca de sinal
+        same_as_lo = np.sign(value) == np.sign(f_lo)
+        lo = np.where(active & same_as_lo, rate, lo)
+        f_lo = np.where(active & same_as_lo, value, f_lo)
+        hi = np.where(active & ~same_as_lo, rate, hi)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            newton = rate - value / derivative
+        inside = np.isfinite(newton) & (newton > lo) & (newton < hi)
+        step = np.where(inside, newton, (lo + hi) / 2)
+
+        converged = (np.abs(value) <= tol * scale) | (np.abs(step - rate) <= tol) | (hi - lo <= tol)
+        active &= ~converged
+        rate = np.where(active, step, rate)
+
+    return np.where(valid, rate, np.nan)
+
+
+def annualize(monthly_rate):
+    """Converte taxa mensal em anual equivalente: (1 + i)^12 - 1."""
+    return (1.0 + monthly_rate) ** 12 - 1.0
+
+
+def borrower_cashflows(principal, months, installment, upfront_costs):
+    """Fluxos do tomador: recebe P - custos em t = 0 e paga a prestação de 1 a n.
+
+    Aceita arrays (um cenário por posição); prazos diferentes são completados
+    com zeros até o maior prazo.
+    """
+    principal = np.atleast_1d(np.asarray(principal, dtype=float))
+    months = np.atleast_1d(np.asarray(months, dtype=np.int64))
+    installment = np.atleast_1d(np.asarray(installment, dtype=float))
+    upfront_costs = np.atleast_1d(np.asarray(upfront_costs, dtype=float))
+
+    periods = np.arange(int(months.max()) + 1)
+    flows = np.where(
+        (periods >= 1) & (periods <= months[:, np.newaxis]),
+        -installment[:, np.newaxis],
+        0.0
+    )
+    flows[:, 0] = principal - upfront_costs
+    return flows
+
+
+def cet_rates(principal, months, installment, upfront_costs):
+    """CET mensal e anual (%, 2 casas) de vários cenários numa única resolução.
+
+    Cenários sem solução (ex.: principal zero) recebem None.
+    """
+    flows = borrower_cashflows(principal, months, installment, upfront_costs)
+    monthly = solve_irr(flows)
+    solved = np.isfinite(monthly)
+    monthly_percent = round2(np.where(solved, monthly * 100, 0.0))
+    annual_percent = round2(np.where(solved, annualize(np.where(solved, monthly, 0.0)) * 100, 0.0))
+    return (
+        [v if ok else None for v, ok in zip(monthly_percent.tolist(), solved.tolist())],
+        [v if ok else None for v, ok in zip(annual_percent.tolist(), solved.tolist())],
+    )
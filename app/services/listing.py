@@ -0,0 +1,63 @@
+"""Utilitários das listagens da API: seleção de campos e NDJSON em streaming.
+
+As listagens paginam por cursor (keyset) e podem ser transmitidas como NDJSON
+(um objeto JSON por linha), lidas do banco em lotes com `yield_per` para que
+a memória não cresça com o tamanho do resultado.
+"""
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+# Linhas buscadas por vez do cursor do servidor no modo streaming
+STREAM_BATCH_SIZE = 1000
+
+
+def parse_fields(raw, allowed, default):
+    """Campos pedidos em `?fields=a,b` (na ordem de `allowed`); ValueError se inválido."""
+    if not raw:
+        return tuple(default)
+    requested = {field.strip() for field in raw.split(',') if field.strip()}
+    unknown = requested - set(allowed)
+    if unknown:
+        raise ValueError(f"Campos inválidos: {', '.join(sorted(unknown))} (use {', '.join(allowed)})")
+    return tuple(field for field in allowed if field in requested)
+
+
+def wants_ndjson(request):
+    """`?format=ndjson` ou `Accept: application/x-ndjson`."""
+    if request.args.get('format') == 'ndjson':
+        return True
+    return request.accept_mimetypes.best == NDJSON_MIMETYPE
+
+
+def to_json_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def row_to_dict(row, fields):
+    """Linha de um `select` de colunas rotuladas -> dict só com `fields`."""
+    mapping = row._mapping
+    return {field: to_json_value(mapping[field]) for field in fields}
+
+
+def ndjson_lines(dicts):
+    """Gera uma linha JSON por item."""
+    for item in dicts:
+        yield json.dumps(item, ensure_ascii=False) + '\n'
+
+
+def json_object_stream(key, dicts, **extra):
+    """Gera `{"key": [...], **extra}` em pedaços, um item por vez."""
+    yield '{' + json.dumps(key) + ': ['
+    for index, item in enumerate(dicts):
+        yield (',' if index else '') + json.dumps(item, ensure_ascii=False)
+    yield ']'
+    for name, value in extra.items():
+        yield ', ' + json.dumps(name) + ': ' + json.dumps(value)
+    yield '}'
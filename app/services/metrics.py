@@ -0,0 +1,252 @@
+"""Métricas de requisição em memória, expostas em texto no formato Prometheus.
+
+Hooks `before_request`/`after_request` medem a latência de cada endpoint, o
+tamanho da resposta e os status. Dentro da requisição, o tempo gasto em
+calculadoras (`timed("calculator")`), no banco (eventos do cursor) e na
+renderização de templates (sinais do Flask) é somado à parte. Tudo fica por
+processo: cada worker gunicorn expõe os próprios números.
+
+O tempo de banco vem de um único par de listeners do cursor
+(`init_sql_timing`), compartilhado com a auditoria de SQL: cada requisição
+tem um `RequestSQL` com a contagem, o tempo e os observadores de cada comando.
+"""
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+
+from flask import before_render_template, g, has_request_context, request, template_rendered
+from sqlalchemy import event
+
+from ..models import db
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+COMPONENTS = ('calculator', 'db', 'template')
+
+# Limites superiores dos buckets: segundos e bytes
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class Histogram:
+    """Histograma cumulativo de buckets fixos (não thread-safe; o registro trava)."""
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.bounds + (float('inf'),), self.counts):
+            total += count
+            yield bound, total
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.latency = {}
+            self.sizes = {}
+            self.statuses = {}
+            self.components = {}
+
+    def observe_request(self, endpoint, status, seconds, size, components):
+        with self._lock:
+            self.latency.setdefault(endpoint, Histogram(LATENCY_BUCKETS)).observe(seconds)
+            if size is not None:
+                self.sizes.setdefault(endpoint, Histogram(SIZE_BUCKETS)).observe(size)
+            key = (endpoint, status)
+            self.statuses[key] = self.statuses.get(key, 0) + 1
+            for component, elapsed in components.items():
+                self.components.setdefault((endpoint, component), Histogram(LATENCY_BUCKETS)).observe(elapsed)
+
+    def render(self):
+        """Texto no formato de exposição do Prometheus."""
+        lines = []
+        with self._lock:
+            _render_histograms(lines, 'http_request_duration_seconds',
+                               'Latência das requisições por endpoint',
+                               {(('endpoint', e),): h for e, h in self.latency.items()})
+            _render_histograms(lines, 'http_response_size_bytes',
+                               'Tamanho das respostas por endpoint',
+                               {(('endpoint', e),): h for e, h in self.sizes.items()})
+            _render_histograms(lines, 'http_request_component_seconds',
+                               'Tempo em calculadoras, banco e templates por requisição',
+                               {(('endpoint', e), ('component', c)): h
+                                for (e, c), h in self.components.items()})
+
+            lines.append('# HELP http_requests_total Requisições por endpoint e status')
+            lines.append('# TYPE http_requests_total counter')
+            for (endpoint, status), count in sorted(self.statuses.items()):
+                lines.append(f'http_requests_total{_labels((("endpoint", endpoint), ("status", status)))} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(pairs):
+    escaped = (
+        f'{name}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+        for name, value in pairs
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+def _render_histograms(lines, name, help_text, histograms):
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} histogram')
+    for labels, histogram in sorted(histograms.items()):
+        for bound, total in histogram.cumulative():
+            le = '+Inf' if bound == float('inf') else repr(bound)
+            lines.append(f'{name}_bucket{_labels(labels + (("le", le),))} {total}')
+        lines.append(f'{name}_sum{_labels(labels)} {histogram.sum:.6f}')
+        lines.append(f'{name}_count{_labels(labels)} {histogram.count}')
+
+
+def _state():
+    return g.get('_metrics') if has_request_context() else None
+
+
+def timed(component):
+    """Decorator: soma o tempo da chamada ao `component` da requisição atual.
+
+    Chamadas aninhadas do mesmo componente (ex.: CET chamando a PRICE) contam
+    uma vez só; fora de uma requisição a função roda sem medição.
+    """
+    depth_key = f'{component}_depth'
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            state = _state()
+            if state is None or state[depth_key]:
+                return func(*args, **kwargs)
+            state[depth_key] += 1
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                state[component] += time.perf_counter() - start
+                state[depth_key] -= 1
+        return wrapper
+    return decorator
+
+
+def _before_request():
+    g._metrics = {'start': time.perf_counter(), 'template_start': None}
+    for component in COMPONENTS:
+        g._metrics[component] = 0.0
+        g._metrics[f'{component}_depth'] = 0
+    current_sql()
+
+
+def _after_request(response):
+    state = g.pop('_metrics', None)
+    if state is None:
+        return response
+    state['db'] = current_sql().seconds
+    registry = _registry()
+    registry.observe_request(
+        request.endpoint or '<unmatched>',
+        response.status_code,
+        time.perf_counter() - state['start'],
+        response.calculate_content_length(),
+        {component: state[component] for component in COMPONENTS if state[component]}
+    )
+    return response
+
+
+class RequestSQL:
+    """Comandos SQL de uma requisição: contagem, tempo e observadores."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.observers = []
+
+    def record(self, statement, elapsed):
+        self.count += 1
+        self.seconds += elapsed
+        for observer in self.observers:
+            observer(statement, elapsed)
+
+
+def current_sql():
+    """`RequestSQL` da requisição atual (criado no primeiro uso), ou None fora dela."""
+    if not has_request_context():
+        return None
+    if '_sql' not in g:
+        g._sql = RequestSQL()
+    return g._sql
+
+
+# Um único instante por conexão: o cursor executa um comando por vez
+_QUERY_START = 'sql_timing_start'
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and '_sql' in g:
+        conn.info[_QUERY_START] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop(_QUERY_START, None)
+    if started is not None and has_request_context() and '_sql' in g:
+        g._sql.record(statement, time.perf_counter() - started)
+
+
+def _handle_error(context):
+    # after_cursor_execute não dispara quando o comando falha
+    if context.connection is not None:
+        context.connection.info.pop(_QUERY_START, None)
+
+
+def init_sql_timing(app):
+    """Liga (uma vez por engine) os listeners que medem os comandos SQL por requisição."""
+    with app.app_context():
+        engine = db.engine
+    if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(engine, 'handle_error', _handle_error)
+
+
+def _before_render(sender, template, context, **extra):
+    state = _state()
+    if state is not None:
+        state['template_start'] = time.perf_counter()
+
+
+def _rendered(sender, template, context, **extra):
+    state = _state()
+    if state is not None and state['template_start'] is not None:
+        state['template'] += time.perf_counter() - state['template_start']
+        state['template_start'] = None
+
+
+def _registry():
+    from flask import current_app
+    return current_app.extensions['metrics']
+
+
+def init_metrics(app):
+    """Registra os hooks de medição; desligado com METRICS_ENABLED=false."""
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+    app.extensions['metrics'] = MetricsRegistry()
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+
+    init_sql_timing(app)
+
+    before_render_template.connect(_before_render, app)
+    template_rendered.connect(_rendered, app)
@@ -0,0 +1,86 @@
+"""Projeção estocástica (Monte Carlo) da renda fixa.
+
+A taxa mensal segue um processo com reversão à média em torno da taxa
+informada:
+
+    r[t+1] = r[t] + reversion * (r0 - r[t]) + volatility * N(0, 1)
+
+limitada a zero. Os caminhos são gerados em blocos de tamanho fixo; cada bloco
+tem sua própria semente derivada de `seed` (SeedSequence.spawn), então o
+resultado é o mesmo com qualquer número de processos. O laço percorre apenas
+os meses, com todos os caminhos do bloco em um único array.
+"""
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+PERCENTILES = (5, 25, 50, 75, 95)
+
+_executor = None
+_executor_workers = 0
+_executor_lock = threading.Lock()
+
+
+def simulate_block(principal_value, months, interest_rate, n_paths, volatility, reversion, seed_sequence):
+    """Saldos finais de `n_paths` caminhos (executado nos processos do pool)."""
+    rng = np.random.default_rng(seed_sequence)
+    base_rate = interest_rate / 100.0
+    sigma = volatility / 100.0
+
+    rate = np.full(n_paths, base_rate)
+    balance = np.full(n_paths, float(principal_value))
+    for _ in range(months):
+        rate += reversion * (base_rate - rate) + sigma * rng.standard_normal(n_paths)
+        np.maximum(rate, 0.0, out=rate)
+        balance *= 1.0 + rate
+    return balance
+
+
+def _get_executor(workers):
+    """Pool de processos criado sob demanda (spawn: seguro com threads no pai)."""
+    global _executor, _executor_workers
+    with _executor_lock:
+        if _executor is None or _executor_workers != workers:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            _executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+            _executor_workers = workers
+        return _executor
+
+
+def project(principal_value, months, interest_rate, n_paths, volatility=0.05,
+            reversion=0.1, seed=None, workers=1, chunk_size=5000):
+    """Distribui os blocos de caminhos entre `workers` processos.
+
+    Retorna os percentis, a média e o desvio padrão do saldo final.
+    """
+    seed_sequence = np.random.SeedSequence(seed)
+    sizes = [chunk_size] * (n_paths // chunk_size)
+    if n_paths % chunk_size:
+        sizes.append(n_paths % chunk_size)
+    children = seed_sequence.spawn(len(sizes))
+
+    args = [
+        (principal_value, months, interest_rate, size, volatility, reversion, child)
+        for size, child in zip(sizes, children)
+    ]
+    if workers > 1 and len(args) > 1:
+        executor = _get_executor(workers)
+        blocks = list(executor.map(simulate_block, *zip(*args)))
+    else:
+        blocks = [simulate_block(*block_args) for block_args in args]
+
+    final = np.concatenate(blocks)
+    bands = np.percentile(final, PERCENTILES)
+    return {
+        'paths': int(final.size),
+        'seed': seed_sequence.entropy,
+        'percentiles': {f'p{p}': round(float(v), 2) for p, v in zip(PERCENTILES, bands)},
+        'mean': round(float(final.mean()), 2),
+        'std': round(float(final.std()), 2),
+    }
@@ -0,0 +1,100 @@
+"""Operações de um tipo, consultadas só na tabela `entry_*` desse tipo.
+
+O `type_id` é traduzido para o `type_enum.Type` pelo registro de tipos e daí
+para o model em `ENTRY_MODELS`; a consulta seleciona apenas as colunas
+pedidas, filtra por usuário e período no banco e pagina por cursor
+(created_at, id) decrescente, apoiada no índice `ix_<tabela>_type_created`.
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, or_, select
+
+from ..models import db, ENTRY_MODELS, EntryProfit
+from .listing import STREAM_BATCH_SIZE
+
+# Colunas que nunca saem na listagem
+_HIDDEN_COLUMNS = {'output_data', 'deleted_at'}
+
+
+def allowed_fields(Model):
+    return tuple(c.name for c in Model.__table__.columns if c.name not in _HIDDEN_COLUMNS)
+
+
+def default_fields(Model):
+    """Mesmos campos da listagem antiga."""
+    if Model is EntryProfit:
+        return ('id', 'user_id', 'created_at', 'revenue', 'summary')
+    return ('id', 'user_id', 'created_at', 'principal_value', 'interest_rate', 'months', 'summary')
+
+
+def encode_cursor(row):
+    return f"{row.created_at.isoformat()}|{row.id}"
+
+
+def decode_cursor(cursor):
+    created_at, entry_id = cursor.split('|')
+    return datetime.fromisoformat(created_at), int(entry_id)
+
+
+def parse_date(value, end=False):
+    """Data/hora ISO; uma data sem hora no fim do período inclui o dia inteiro."""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    if end and len(value) == 10:
+        parsed += timedelta(days=1)
+    return parsed
+
+
+def parse_user_id(value):
+    """`user_id` do filtro; um valor não inteiro é erro, não ausência de filtro."""
+    if value is None or value == '':
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"user_id inválido: {value}")
+
+
+def operations_query(Model, type_id, fields, user_id=None, date_from=None, date_to=None, after=None):
+    # created_at e id entram sempre: são a chave do cursor
+    names = dict.fromkeys(('created_at', 'id') + tuple(fields))
+    query = select(*(getattr(Model, name) for name in names)).where(Model.type_id == type_id)
+
+    if user_id is not None:
+        query = query.where(Model.user_id == user_id)
+    if date_from is not None:
+        query = query.where(Model.created_at >= date_from)
+    if date_to is not None:
+        query = query.where(Model.created_at < date_to)
+    if after is not None:
+        created_at, entry_id = after
+        query = query.where(or_(
+            Model.created_at < created_at,
+            and_(Model.created_at == created_at, Model.id < entry_id)
+        ))
+    return query.order_by(Model.created_at.desc(), Model.id.desc())
+
+
+def operations_page(query, limit):
+    """Uma página da consulta; dict com `rows` e `next_cursor`."""
+    rows = db.session.execute(query.limit(limit + 1)).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        'rows': rows,
+        'next_cursor': encode_cursor(rows[-1]) if rows and has_more else None,
+    }
+
+
+def iter_operations(query):
+    """Todas as linhas da consulta, lidas em lotes de um cursor do servidor."""
+    result = db.session.execute(query.execution_options(yield_per=STREAM_BATCH_SIZE))
+    try:
+        yield from result
+    finally:
+        result.close()
+
+
+def model_for_type(kind):
+    return ENTRY_MODELS.get(kind)
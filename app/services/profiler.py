@@ -0,0 +1,94 @@
+"""Profiler opcional de uma única requisição (cProfile).
+
+Com PROFILER_ENABLED e um PROFILER_TOKEN definido, o `wsgi_app` é envolvido
+por `RequestProfiler`. Só as requisições que trazem o token no cabeçalho
+`X-Profile` ou no parâmetro `_profile` rodam sob o cProfile. Para cada uma
+são gravados em PROFILER_DIR o `.prof` bruto (snakeviz, `python -m pstats`)
+e um `.txt` com as funções ordenadas por tempo acumulado e seus callees.
+Desligado, nenhum hook é registrado.
+"""
+import cProfile
+import hmac
+import io
+import os
+import pstats
+import re
+import time
+from datetime import datetime
+from urllib.parse import parse_qs
+
+HEADER = 'HTTP_X_PROFILE'
+QUERY_PARAM = '_profile'
+
+
+class RequestProfiler:
+    """Middleware WSGI que perfila as requisições autorizadas pelo token."""
+
+    def __init__(self, wsgi_app, token, directory, top=40):
+        self.wsgi_app = wsgi_app
+        self.token = token
+        self.directory = directory
+        self.top = top
+
+    def _requested(self, environ):
+        supplied = environ.get(HEADER)
+        if supplied is None and QUERY_PARAM in environ.get('QUERY_STRING', ''):
+            supplied = parse_qs(environ['QUERY_STRING']).get(QUERY_PARAM, [None])[0]
+        return supplied is not None and hmac.compare_digest(supplied.encode(), self.token.encode())
+
+    def __call__(self, environ, start_response):
+        if not self._requested(environ):
+            return self.wsgi_app(environ, start_response)
+
+        name = self._report_name(environ)
+
+        def profiled_start_response(status, headers, exc_info=None):
+            headers.append(('X-Profile-Report', name))
+            return start_response(status, headers, exc_info)
+
+        profile = cProfile.Profile()
+        started = time.perf_counter()
+        profile.enable()
+        try:
+            # Consome o corpo aqui para incluir respostas em streaming no perfil
+            iterable = self.wsgi_app(environ, profiled_start_response)
+            try:
+                body = b''.join(iterable)
+            finally:
+                if hasattr(iterable, 'close'):
+                    iterable.close()
+        finally:
+            profile.disable()
+            self._dump(profile, name, environ, time.perf_counter() - started)
+        return [body]
+
+    def _report_name(self, environ):
+        path = re.sub(r'[^A-Za-z0-9]+', '_', environ.get('PATH_INFO', '')).strip('_') or 'root'
+        stamp = datetime.now().strftime('%Y%m%dT%H%M%S%f')
+        return f"{stamp}-{environ.get('REQUEST_METHOD', 'GET')}-{path[:60]}"
+
+    def _dump(self, profile, name, environ, elapsed):
+        os.makedirs(self.directory, exist_ok=True)
+        base = os.path.join(self.directory, name)
+        profile.dump_stats(base + '.prof')
+
+        output = io.StringIO()
+        # Sem a query string: ela pode conter o token
+        output.write(f"{environ.get('REQUEST_METHOD')} {environ.get('PATH_INFO')}  {elapsed * 1000:.1f} ms\n\n")
+        stats = pstats.Stats(profile, stream=output)
+        stats.strip_dirs().sort_stats('cumulative').print_stats(self.top)
+        stats.print_callees(self.top)
+        with open(base + '.txt', 'w', encoding='utf-8') as fp:
+            fp.write(output.getvalue())
+
+
+def init_profiler(app):
+    """Envolve o app no profiler quando PROFILER_ENABLED e PROFILER_TOKEN estão definidos."""
+    if not app.config.get('PROFILER_ENABLED'):
+        return
+    token = app.config.get('PROFILER_TOKEN')
+    if not token:
+        app.logger.warning("PROFILER_ENABLED sem PROFILER_TOKEN: profiler não ativado")
+        return
+    directory = app.config.get('PROFILER_DIR') or os.path.join(app.instance_path, 'profiles')
+    app.wsgi_app = RequestProfiler(app.wsgi_app, token, directory, app.config['PROFILER_TOP'])
@@ -0,0 +1,125 @@
+"""Auditoria de SQL por requisição: contagem, tempo, lentas e N+1.
+
+A contagem e o tempo de banco vêm do listener de cursor compartilhado com
+as métricas (`metrics.current_sql`); a auditoria só observa cada comando.
+Ao final, a requisição é comparada com o orçamento (SQL_QUERY_BUDGET) e com
+o limite de repetições (SQL_REPEAT_THRESHOLD): o mesmo comando executado
+várias vezes só com parâmetros diferentes é o padrão típico de N+1 (ex.:
+lazy load de `simulation.user` dentro de um laço).
+
+Os problemas vão para o log e para o cabeçalho `X-SQL-Audit`; em produção a
+resposta nunca é trocada, já que o handler pode ter gravado dados. Com
+`app.testing` o `check_query_budget` roda depois da auditoria e levanta
+`QueryBudgetExceeded`, que o test client propaga: testes e o benchmark de
+carga falham na requisição marcada.
+"""
+import heapq
+import re
+from collections import Counter
+
+from flask import g, request
+
+from .metrics import current_sql, init_sql_timing
+
+AUDIT_HEADER = 'X-SQL-Audit'
+
+# Listas de parâmetros de tamanhos diferentes (IN (?, ?, ?)) viram um só formato
+_PARAM_LIST = re.compile(r"\(\s*(?:\?|%s|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|%s|%\(\w+\)s|:\w+))*\s*\)")
+_SPACES = re.compile(r"\s+")
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """Resposta acima do orçamento de consultas ou com N+1 (ver `check_query_budget`)."""
+
+
+def normalize(statement):
+    """Texto do comando sem variações de parâmetros e espaços."""
+    return _PARAM_LIST.sub("(?)", _SPACES.sub(" ", statement).strip())
+
+
+class RequestQueries:
+    """Consultas de uma requisição."""
+
+    def __init__(self, keep_slowest):
+        self.statements = Counter()
+        self.slowest = []
+        self._keep = keep_slowest
+        self._seen = 0
+
+    def record(self, statement, elapsed):
+        self._seen += 1
+        key = normalize(statement)
+        self.statements[key] += 1
+        entry = (elapsed, self._seen, key)
+        if len(self.slowest) < self._keep:
+            heapq.heappush(self.slowest, entry)
+        elif entry > self.slowest[0]:
+            heapq.heapreplace(self.slowest, entry)
+
+    def repeated(self, threshold):
+        return [(statement, count) for statement, count in self.statements.most_common()
+                if count >= threshold]
+
+    def slowest_statements(self):
+        return [(elapsed, statement) for elapsed, _, statement in sorted(self.slowest, reverse=True)]
+
+
+def _shorten(statement, limit=200):
+    return statement if len(statement) <= limit else statement[:limit] + '...'
+
+
+def check_query_budget(response):
+    """Falha com `QueryBudgetExceeded` se a auditoria marcou a resposta."""
+    problems = response.headers.get(AUDIT_HEADER)
+    if problems:
+        raise QueryBudgetExceeded(problems)
+    return response
+
+
+def init_query_audit(app):
+    """Liga a auditoria de SQL (SQL_AUDIT_ENABLED) nos hooks da aplicação."""
+    if not app.config.get('SQL_AUDIT_ENABLED'):
+        return
+    init_sql_timing(app)
+
+    if app.testing:
+        # Registrado antes de `_finish_audit`, roda depois dele (ordem reversa)
+        app.after_request(check_query_budget)
+
+    @app.before_request
+    def _start_audit():
+        queries = g._sql_queries = RequestQueries(app.config['SQL_AUDIT_LOG_SLOWEST'])
+        current_sql().observers.append(queries.record)
+
+    @app.after_request
+    def _finish_audit(response):
+        queries = g.pop('_sql_queries', None)
+        if queries is None:
+            return response
+
+        sql = current_sql()
+        response.headers['X-SQL-Queries'] = str(sql.count)
+        response.headers['X-SQL-Time-ms'] = f"{sql.seconds * 1000:.2f}"
+
+        budget = app.config['SQL_QUERY_BUDGET']
+        slow_seconds = app.config['SQL_SLOW_QUERY_MS'] / 1000
+        route = request.endpoint or request.path
+        problems, codes = [], []
+        if budget and sql.count > budget:
+            problems.append(f"{sql.count} consultas (orçamento {budget})")
+            codes.append(f"budget={sql.count}/{budget}")
+        repeated = queries.repeated(app.config['SQL_REPEAT_THRESHOLD'])
+        for statement, count in repeated:
+            problems.append(f"possível N+1: {count}x {_shorten(statement)}")
+        if repeated:
+            codes.append(f"repeated={max(count for _, count in repeated)}")
+
+        slowest = queries.slowest_statements()
+        if problems or (slowest and slowest[0][0] >= slow_seconds):
+            for elapsed, statement in slowest:
+                app.logger.warning(f"[sql] {route} {elapsed * 1000:.1f} ms: {_shorten(statement)}")
+
+        if problems:
+            response.headers[AUDIT_HEADER] = '; '.join(codes)
+            app.logger.warning(f"[sql] {route}: " + "; ".join(problems))
+        return response
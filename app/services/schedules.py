@@ -0,0 +1,227 @@
+"""Motor vetorizado (NumPy) das tabelas de amortização e de renda fixa.
+
+Cada tabela é montada como um dicionário de colunas NumPy em vez de uma lista
+de dicionários linha a linha. As funções de `calculator_controller` são apenas
+invólucros finos sobre este módulo e convertem as colunas para o formato de
+linhas com `to_rows`.
+
+Há dois motores para as tabelas com arredondamento por linha (PRICE e renda
+fixa): "float", o legado, que arredonda floats com `round(..., 2)`, e
+"cents", que faz toda a recorrência em centavos inteiros e fecha o saldo da
+PRICE exatamente em zero ajustando a última prestação.
+"""
+from fractions import Fraction
+
+import numpy as np
+
+SAC_COLUMNS = ("mes", "amortizacao", "juros", "prestacao", "saldo_devedor")
+PRICE_COLUMNS = SAC_COLUMNS
+FIXED_INCOME_COLUMNS = ("mes", "juros", "saldo")
+ENGINES = ("float", "cents")
+
+
+def sac_columns(principal_value, months, interest_rate):
+    """Colunas da tabela SAC.
+
+    `np.subtract.accumulate` é sequencial, então reproduz bit a bit o
+    `saldo -= amortization` do laço original.
+    """
+    amortization = round(principal_value / months, 2)
+    r = interest_rate / 100
+
+    saldos = np.subtract.accumulate(
+        np.concatenate(([principal_value], np.full(months, amortization)))
+    )
+    juros = saldos[:-1] * r
+
+    return {
+        "mes": np.arange(1, months + 1),
+        "amortizacao": np.full(months, amortization),
+        "juros": juros,
+        "prestacao": amortization + juros,
+        "saldo_devedor": np.maximum(saldos[1:], 0),
+    }
+
+
+def annuity(principal_value, months, r):
+    """Fórmula da anuidade (sem arredondar); aceita escalares ou arrays NumPy."""
+    growth = (1 + r) ** months
+    return principal_value * (r * growth) / (growth - 1)
+
+
+def price_installment(principal_value, months, interest_rate):
+    """Prestação constante do sistema PRICE (fórmula da anuidade), arredondada."""
+    r = interest_rate / 100.0
+    if r == 0:
+        return round(principal_value / months, 2)
+    return round(annuity(principal_value, months, r), 2)
+
+
+def round2(values):
+    """Arredonda um array como o `round(x, 2)` do Python (np.round difere nos empates).
+
+    `rint(x * 100) / 100` já dá o mesmo resultado, exceto quando x * 100 fica
+    a poucos ulps de meio centavo (o erro do produto pode decidir o lado) ou
+    é grande demais para ter casas decimais; só esses valores passam pelo
+    `round` do Python.
+    """
+    values = np.asarray(values, dtype=float)
+    flat = values.ravel()
+    scaled = flat * 100
+    result = np.rint(scaled) / 100
+    fraction = np.abs(scaled - np.floor(scaled) - 0.5)
+    exact = (fraction > 4 * np.spacing(np.abs(scaled))) & (np.abs(scaled) < 2.0 ** 52)
+    if not exact.all():
+        result[~exact] = [round(v, 2) for v in flat[~exact].tolist()]
+    return result.reshape(values.shape)
+
+
+def price_columns(principal_value, months, interest_rate):
+    """Colunas da tabela PRICE.
+
+    O arredondamento de cada linha alimenta o saldo da linha seguinte, então a
+    recorrência continua sequencial (em floats escalares, sem montar dicts);
+    apenas a montagem das colunas é vetorizada.
+    """
+    r = interest_rate / 100.0
+    prestacao = price_installment(principal_value, months, interest_rate)
+
+    juros = [0.0] * months
+    amortizacao = [0.0] * months
+    saldos = [0.0] * months
+    saldo = principal_value
+
+    for i in range(months):
+        j = round(saldo * r, 2)
+        a = round(prestacao - j, 2)
+        saldo = round(saldo - a, 2)
+        if saldo < 0:
+            saldo = 0.0
+        juros[i] = j
+        amortizacao[i] = a
+        saldos[i] = saldo
+
+    return {
+        "mes": np.arange(1, months + 1),
+        "amortizacao": np.array(amortizacao),
+        "juros": np.array(juros),
+        "prestacao": np.full(months, prestacao),
+        "saldo_devedor": np.array(saldos),
+    }
+
+
+def fixed_income_columns(principal_value, months, interest_rate):
+    """Colunas da simulação de renda fixa (capitalização mensal arredondada)."""
+    r = interest_rate / 100.0
+
+    juros = [0.0] * months
+    saldos = [0.0] * months
+    saldo = principal_value
+
+    for i in range(months):
+        j = round(saldo * r, 2)
+        saldo = round(saldo + j, 2)
+        juros[i] = j
+        saldos[i] = saldo
+
+    return {
+        "mes": np.arange(1, months + 1),
+        "juros": np.array(juros),
+        "saldo": np.array(saldos),
+    }
+
+
+def _div_half_up(numerator, denominator):
+    """Divisão inteira arredondando meio centavo para longe do zero."""
+    quotient = (2 * abs(numerator) + denominator) // (2 * denominator)
+    return quotient if numerator >= 0 else -quotient
+
+
+def to_cents(value):
+    """Valor decimal (como digitado) em centavos inteiros."""
+    value = Fraction(str(value)) * 100
+    return _div_half_up(value.numerator, value.denominator)
+
+
+def _rate_fraction(interest_rate):
+    """Taxa percentual como fração exata (numerador, denominador): 1.5 -> (3, 200)."""
+    rate = Fraction(str(interest_rate)) / 100
+    return rate.numerator, rate.denominator
+
+
+def _from_cents(values):
+    return np.array(values, dtype=np.int64) / 100
+
+
+def price_columns_cents(principal_value, months, interest_rate):
+    """Colunas da tabela PRICE calculadas em centavos inteiros.
+
+    Os juros de cada mês são saldo x taxa com a taxa como fração exata, então
+    não há erro de ponto flutuante acumulado. A amortização nunca passa do
+    saldo, a última quita o que restar e a última prestação absorve a
+    diferença, de modo que o saldo final é exatamente zero.
+    """
+    num, den = _rate_fraction(interest_rate)
+    prestacao = to_cents(price_installment(principal_value, months, interest_rate))
+    saldo = to_cents(principal_value)
+
+    juros = [0] * months
+    amortizacao = [0] * months
+    prestacoes = [prestacao] * months
+    saldos = [0] * months
+
+    for i in range(months):
+        j = _div_half_up(saldo * num, den)
+        a = saldo if i == months - 1 else min(prestacao - j, saldo)
+        saldo -= a
+        juros[i] = j
+        amortizacao[i] = a
+        prestacoes[i] = a + j
+        saldos[i] = saldo
+
+    return {
+        "mes": np.arange(1, months + 1),
+        "amortizacao": _from_cents(amortizacao),
+        "juros": _from_cents(juros),
+        "prestacao": _from_cents(prestacoes),
+        "saldo_devedor": _from_cents(saldos),
+    }
+
+
+def fixed_income_columns_cents(principal_value, months, interest_rate):
+    """Colunas da renda fixa calculadas em centavos inteiros."""
+    num, den = _rate_fraction(interest_rate)
+    saldo = to_cents(principal_value)
+
+    juros = [0] * months
+    saldos = [0] * months
+
+    for i in range(months):
+        j = _div_half_up(saldo * num, den)
+        saldo += j
+        juros[i] = j
+        saldos[i] = saldo
+
+    return {
+        "mes": np.arange(1, months + 1),
+        "juros": _from_cents(juros),
+        "saldo": _from_cents(saldos),
+    }
+
+
+PRICE_ENGINES = {"float": price_columns, "cents": price_columns_cents}
+FIXED_INCOME_ENGINES = {"float": fixed_income_columns, "cents": fixed_income_columns_cents}
+
+
+def running_total(values):
+    """Soma sequencial (igual a `total += v` num laço), ao contrário de `np.sum`."""
+    if len(values) == 0:
+        return 0.0
+    return float(np.add.accumulate(values)[-1])
+
+
+def to_rows(colunas):
+    """Converte as colunas NumPy na lista de dicts usada pelos templates e pelo JSON."""
+    keys = list(colunas)
+    values = [colunas[key].tolist() for key in keys]
+    return [dict(zip(keys, row)) for row in zip(*values)]
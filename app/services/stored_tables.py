@@ -0,0 +1,234 @@
+"""Tabelas do `output_data`: gravadas inteiras ou recalculadas na leitura.
+
+SAC, PRICE, crédito e renda fixa dependem só de (principal_value, months,
+interest_rate) e do motor. Com OUTPUT_STORAGE_MODE="recompute" o
+`output_data` desses tipos guarda apenas os totais, as entradas exatas
+(as colunas do banco arredondam para 2 casas), o motor e ENGINE_VERSION;
+`load_table` remonta a tabela na leitura usando as calculadoras, que já
+passam pelo `calculator_cache`. CET e lucro continuam gravados inteiros.
+
+Uma linha gravada com outra ENGINE_VERSION não é recalculada: o motor atual
+pode gerar uma tabela diferente dos totais guardados, então `load_table`
+levanta `EngineVersionMismatch` e a tela mostra só os totais. Por isso o
+incremento da versão exige regravar antes as tabelas (`restore_rows`).
+
+`slim_output` é usado pelo `flask slim-outputs`: só remove a tabela de uma
+linha antiga depois de conferir que o recálculo a reproduz. `restore_output`
+faz o caminho inverso no `flask restore-outputs`.
+"""
+import json
+import math
+
+from flask import current_app
+from sqlalchemy.orm import undefer
+
+from ..models import db, type_enum, ENTRY_MODELS
+from . import table_format
+
+# Incrementar sempre que uma mudança em schedules.py alterar as tabelas.
+# Linhas enxutas só guardam as entradas e apenas o motor da versão gravada
+# reproduz a tabela delas: antes de publicar o incremento, rode
+# `flask restore-outputs` com o código ainda na versão atual para regravar as
+# tabelas inteiras. Depois do deploy, `flask slim-outputs` as enxuga de novo.
+ENGINE_VERSION = 1
+
+STORAGE_MODES = ('full', 'recompute')
+RECOMPUTABLE = (
+    type_enum.Type.SAC,
+    type_enum.Type.PRICE,
+    type_enum.Type.CREDIT,
+    type_enum.Type.FIXED_INCOME,
+)
+
+
+class EngineVersionMismatch(ValueError):
+    """Simulação enxuta gravada com uma versão do motor diferente da atual."""
+
+
+def validate_mode(mode):
+    """Confere OUTPUT_STORAGE_MODE no boot (ValueError se desconhecido)."""
+    if mode not in STORAGE_MODES:
+        raise ValueError(f"OUTPUT_STORAGE_MODE inválido: {mode} (use {', '.join(STORAGE_MODES)})")
+
+
+def compute_table(kind, principal_value, months, interest_rate, engine='float'):
+    """Tabela em linhas de um tipo recalculável (resultado em cache)."""
+    from ..controllers import calculator_controller
+
+    if kind is type_enum.Type.SAC:
+        tabela, _, _ = calculator_controller.sac_system_calculation(principal_value, months, interest_rate)
+        return tabela
+    calculation = {
+        type_enum.Type.PRICE: calculator_controller.price_system_calculation,
+        type_enum.Type.CREDIT: calculator_controller.credit_system_calculation,
+        type_enum.Type.FIXED_INCOME: calculator_controller.fixed_income_simulation,
+    }[kind]
+    tabela, _, _ = calculation(principal_value, months, interest_rate, engine=engine)
+    return tabela
+
+
+def storage_fields(kind, tabela, principal_value, months, interest_rate, engine='float'):
+    """Campos do `output_data` que representam a tabela no modo configurado."""
+    if current_app.config['OUTPUT_STORAGE_MODE'] != 'recompute' or kind not in RECOMPUTABLE:
+        return {'tabela': table_format.for_storage(tabela)}
+    return {
+        'inputs': {'principal_value': principal_value, 'months': months, 'interest_rate': interest_rate},
+        'engine': engine,
+        'engine_version': ENGINE_VERSION,
+    }
+
+
+def is_slim(output_data):
+    return bool(output_data) and 'tabela' not in output_data and 'engine_version' in output_data
+
+
+def _inputs(simulation):
+    stored = (simulation.output_data or {}).get('inputs') or {}
+    return (
+        float(stored.get('principal_value', simulation.principal_value)),
+        int(stored.get('months', simulation.months)),
+        float(stored.get('interest_rate', simulation.interest_rate)),
+    )
+
+
+def load_table(kind, simulation):
+    """Tabela em linhas de uma simulação, gravada ou recalculada.
+
+    Levanta `EngineVersionMismatch` em vez de recalcular com outro motor.
+    """
+    output_data = simulation.output_data or {}
+    if not is_slim(output_data):
+        return table_format.to_rows(output_data.get('tabela'))
+    if kind not in RECOMPUTABLE:
+        return []
+    if output_data['engine_version'] != ENGINE_VERSION:
+        raise EngineVersionMismatch(
+            f"Simulação {kind.name} {simulation.id} gravada com a versão "
+            f"{output_data['engine_version']} do motor (atual {ENGINE_VERSION})"
+        )
+    return compute_table(kind, *_inputs(simulation), engine=output_data.get('engine', 'float'))
+
+
+def _same_table(stored, computed, tolerance=1e-9):
+    if len(stored) != len(computed):
+        return False
+    for left, right in zip(stored, computed):
+        if left.keys() != right.keys():
+            return False
+        for key, value in left.items():
+            if not math.isclose(value, right[key], rel_tol=0, abs_tol=tolerance):
+                return False
+    return True
+
+
+def slim_output(kind, simulation):
+    """`output_data` sem a tabela, ou None se o recálculo não a reproduz.
+
+    Linhas antigas não registram o motor: os dois são tentados e fica o
+    primeiro que reproduz a tabela gravada.
+    """
+    from . import schedules
+
+    output_data = simulation.output_data or {}
+    if kind not in RECOMPUTABLE or 'tabela' not in output_data:
+        return None
+
+    stored = table_format.to_rows(output_data['tabela'])
+    principal_value, months, interest_rate = _inputs(simulation)
+    engines = ('float',) if kind is type_enum.Type.SAC else schedules.ENGINES
+    for engine in engines:
+        computed = compute_table(kind, principal_value, months, interest_rate, engine=engine)
+        if _same_table(stored, computed):
+            slim = {key: value for key, value in output_data.items() if key != 'tabela'}
+            slim.update(
+                inputs={'principal_value': principal_value, 'months': months, 'interest_rate': interest_rate},
+                engine=engine,
+                engine_version=ENGINE_VERSION,
+            )
+            return slim
+    return None
+
+
+def restore_output(kind, simulation):
+    """`output_data` enxuto com a tabela de volta (formato OUTPUT_TABLE_FORMAT).
+
+    Levanta `EngineVersionMismatch` se a linha é de outra versão do motor.
+    """
+    tabela = load_table(kind, simulation)
+    full = {key: value for key, value in simulation.output_data.items()
+            if key not in ('inputs', 'engine', 'engine_version')}
+    full['tabela'] = table_format.for_storage(tabela)
+    return full
+
+
+def _json_size(value):
+    return len(json.dumps(value, ensure_ascii=False))
+
+
+def slim_rows(kind, batch_size=500, dry_run=False):
+    """Remove a tabela das linhas de um tipo que o recálculo reproduz.
+
+    Percorre a tabela por id em lotes (um commit por lote) e devolve as
+    contagens e os bytes de JSON antes/depois.
+    """
+    Model = ENTRY_MODELS[kind]
+    report = {'rows': 0, 'slimmed': 0, 'mismatched': 0, 'bytes_before': 0, 'bytes_after': 0}
+    last_id = 0
+    while True:
+        batch = (Model.query.options(undefer(Model.output_data))
+                 .filter(Model.id > last_id).order_by(Model.id).limit(batch_size).all())
+        if not batch:
+            break
+        for simulation in batch:
+            report['rows'] += 1
+            if not simulation.output_data or 'tabela' not in simulation.output_data:
+                continue
+            slim = slim_output(kind, simulation)
+            if slim is None:
+                report['mismatched'] += 1
+                current_app.logger.warning(f"{Model.__tablename__} {simulation.id}: recálculo difere, mantida")
+                continue
+            report['slimmed'] += 1
+            report['bytes_before'] += _json_size(simulation.output_data)
+            report['bytes_after'] += _json_size(slim)
+            if not dry_run:
+                simulation.output_data = slim
+        last_id = batch[-1].id
+        if not dry_run:
+            db.session.commit()
+        db.session.expunge_all()
+    return report
+
+
+def restore_rows(kind, batch_size=500, dry_run=False):
+    """Regrava a tabela inteira nas linhas enxutas de um tipo.
+
+    Linhas de outra versão do motor não têm como ser remontadas e só entram
+    na contagem `stale`.
+    """
+    Model = ENTRY_MODELS[kind]
+    report = {'rows': 0, 'restored': 0, 'stale': 0}
+    last_id = 0
+    while True:
+        batch = (Model.query.options(undefer(Model.output_data))
+                 .filter(Model.id > last_id).order_by(Model.id).limit(batch_size).all())
+        if not batch:
+            break
+        for simulation in batch:
+            report['rows'] += 1
+            if not is_slim(simulation.output_data):
+                continue
+            try:
+                full = restore_output(kind, simulation)
+            except EngineVersionMismatch as e:
+                report['stale'] += 1
+                current_app.logger.warning(str(e))
+                continue
+            report['restored'] += 1
+            if not dry_run:
+                simulation.output_data = full
+        last_id = batch[-1].id
+        if not dry_run:
+            db.session.commit()
+        db.session.expunge_all()
+    return report
@@ -0,0 +1,22 @@
+"""Resumo das simulações guardado na coluna `summary` das tabelas `entry_*`.
+
+As listagens mostram apenas estes totais e nunca carregam o `output_data`,
+que contém a tabela completa.
+"""
+
+SUMMARY_KEYS = (
+    'total_interest',
+    'total_amount',
+    'total_costs',
+    'cet_percent',
+    'cet_monthly',
+    'net_profit',
+    'margin_net',
+)
+
+
+def build_summary(output_data):
+    """Extrai os totais de um `output_data` (campos ausentes são ignorados)."""
+    if not output_data:
+        return {}
+    return {key: output_data[key] for key in SUMMARY_KEYS if key in output_data}
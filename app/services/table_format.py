@@ -0,0 +1,64 @@
+"""Formato colunar das tabelas de amortização (API e `output_data`).
+
+No formato de linhas, o legado, cada mês repete todas as chaves
+(`[{"mes": 1, "amortizacao": ..., ...}, ...]`). O colunar guarda uma lista
+por coluna e alguns metadados:
+
+    {"format": "columnar", "length": 420,
+     "columns": {"mes": [1, 2, ...], "amortizacao": [...], ...}}
+
+Na API ele é opt-in (`?format=columnar` ou `Accept: COLUMNAR_MIMETYPE`).
+No banco é usado quando OUTPUT_TABLE_FORMAT="columnar"; `to_rows` lê os
+dois formatos, então linhas antigas continuam legíveis.
+"""
+from flask import current_app
+
+COLUMNAR_MIMETYPE = 'application/vnd.ifinance.columnar+json'
+TABLE_FORMATS = ('rows', 'columnar')
+
+
+def validate_format(table_format):
+    """Confere OUTPUT_TABLE_FORMAT no boot (ValueError se desconhecido)."""
+    if table_format not in TABLE_FORMATS:
+        raise ValueError(f"OUTPUT_TABLE_FORMAT inválido: {table_format} (use {', '.join(TABLE_FORMATS)})")
+
+
+def is_columnar(table):
+    return isinstance(table, dict) and table.get('format') == 'columnar'
+
+
+def to_columnar(rows):
+    """Lista de dicts (todas com as mesmas chaves) -> tabela colunar."""
+    if is_columnar(rows):
+        return rows
+    rows = rows or []
+    keys = list(rows[0]) if rows else []
+    values = zip(*(row.values() for row in rows)) if rows else ()
+    return {
+        'format': 'columnar',
+        'length': len(rows),
+        'columns': dict(zip(keys, map(list, values))),
+    }
+
+
+def to_rows(table):
+    """Tabela em qualquer formato -> lista de dicts (formato legado)."""
+    if not is_columnar(table):
+        return table or []
+    columns = table['columns']
+    keys = list(columns)
+    return [dict(zip(keys, row)) for row in zip(*columns.values())]
+
+
+def wants_columnar(request):
+    """`?format=columnar` ou `Accept: application/vnd.ifinance.columnar+json`."""
+    if request.args.get('format') == 'columnar':
+        return True
+    return request.accept_mimetypes.best == COLUMNAR_MIMETYPE
+
+
+def for_storage(rows):
+    """Tabela no formato configurado para o `output_data` (OUTPUT_TABLE_FORMAT)."""
+    if current_app.config['OUTPUT_TABLE_FORMAT'] == 'columnar':
+        return to_columnar(rows)
+    return rows
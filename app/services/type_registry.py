@@ -0,0 +1,79 @@
+"""Registro em memória dos tipos de operação (`type_operations`).
+
+Os ids de cada `type_enum.Type` são carregados uma vez por worker num mapa
+imutável e reaproveitados por todos os `simulate_*`, sem consulta ao banco.
+`invalidate()` descarta o mapa (chamado por `create_type`).
+"""
+import threading
+from types import MappingProxyType
+
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+
+from ..models import db, TypeOperation
+from ..models.type_enum import Type
+
+# Nome e descrição padrão de cada tipo (também usados no seed inicial)
+TYPE_DEFAULTS = {
+    Type.SAC: ('SAC', 'Sistema de Amortização Constante.'),
+    Type.PRICE: ('PRICE', 'Sistema Francês de amortização.'),
+    Type.CREDIT: ('Crédito', 'Simulação de operações de crédito.'),
+    Type.PROFIT: ('Lucro', 'Simulação de resultado de negócio.'),
+    Type.CET: ('CET', 'Custo Efetivo Total.'),
+    Type.FIXED_INCOME: ('Renda Fixa', 'Investimentos em renda fixa.'),
+}
+
+_EXTENSION_KEY = 'type_registry'
+_lock = threading.Lock()
+
+
+def _create_type(name, description):
+    """Cria o tipo; se outro worker criou antes (nome único), reaproveita."""
+    try:
+        type_op = TypeOperation(name=name, description=description)
+        db.session.add(type_op)
+        db.session.commit()
+        return type_op.id
+    except IntegrityError:
+        db.session.rollback()
+        return TypeOperation.query.filter_by(name=name).one().id
+
+
+def _build_registry():
+    rows = db.session.query(TypeOperation.id, TypeOperation.name).all()
+    by_name = {name.lower(): type_id for type_id, name in rows}
+
+    ids = {}
+    for kind, (name, description) in TYPE_DEFAULTS.items():
+        type_id = by_name.get(name.lower()) or by_name.get(kind.name.lower())
+        ids[kind] = type_id if type_id is not None else _create_type(name, description)
+    return MappingProxyType(ids)
+
+
+def get_registry():
+    """Mapa imutável Type -> id, carregado na primeira chamada do app atual."""
+    registry = current_app.extensions.get(_EXTENSION_KEY)
+    if registry is None:
+        with _lock:
+            registry = current_app.extensions.get(_EXTENSION_KEY)
+            if registry is None:
+                registry = _build_registry()
+                current_app.extensions[_EXTENSION_KEY] = registry
+    return registry
+
+
+def get_type_id(kind):
+    """Id do `type_operations` correspondente ao enum `kind`."""
+    return get_registry()[kind]
+
+
+def get_kind(type_id):
+    """Inverso de `get_type_id`: o `Type` de um id, ou None para tipos sem tabela."""
+    for kind, registered_id in get_registry().items():
+        if registered_id == type_id:
+            return kind
+    return None
+
+
+def invalidate():
+    current_app.extensions.pop(_EXTENSION_KEY, None)
@@ -0,0 +1,40 @@
+"""Listagem de usuários paginada por id (keyset) ou em streaming."""
+from sqlalchemy import select
+
+from ..models import db, User
+from .listing import STREAM_BATCH_SIZE
+
+# Campos expostos pela API (nunca o password_hash)
+USER_FIELDS = ('id', 'name', 'email', 'phone', 'ifrn_id', 'created_at', 'updated_at')
+DEFAULT_USER_FIELDS = ('id', 'name', 'email', 'created_at')
+
+
+def _query(fields, after):
+    # O id entra sempre: é a chave do cursor
+    columns = [getattr(User, field) for field in dict.fromkeys(('id',) + tuple(fields))]
+    query = select(*columns).order_by(User.id)
+    if after is not None:
+        query = query.where(User.id > after)
+    return query
+
+
+def users_page(fields, limit, after=None):
+    """Uma página de usuários depois do id `after`; dict com `rows` e `next_cursor`."""
+    rows = db.session.execute(_query(fields, after).limit(limit + 1)).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        'rows': rows,
+        'next_cursor': rows[-1].id if rows and has_more else None,
+    }
+
+
+def iter_users(fields, after=None):
+    """Todos os usuários depois de `after`, lidos em lotes de um cursor do servidor."""
+    result = db.session.execute(
+        _query(fields, after).execution_options(yield_per=STREAM_BATCH_SIZE)
+    )
+    try:
+        yield from result
+    finally:
+        result.close()
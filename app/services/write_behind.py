@@ -0,0 +1,150 @@
+"""Persistência write-behind das simulações.
+
+Com `WRITE_BEHIND_ENABLED`, os `simulate_*` enfileiram a linha numa fila
+limitada em memória e respondem sem esperar o commit. Uma thread do worker
+drena a fila e grava em lote (um `executemany` por tabela). Se a fila estiver
+cheia além de `WRITE_BEHIND_PUT_TIMEOUT`, `submit` devolve False e quem chamou
+grava de forma síncrona. A fila é esvaziada no encerramento do processo.
+"""
+import atexit
+import os
+import queue
+import threading
+from datetime import datetime
+
+from sqlalchemy import insert
+
+from ..models import db
+
+_STOP = object()
+
+
+class WriteBehindQueue:
+    def __init__(self, app, maxsize=1000, batch_size=100, flush_interval=0.5, put_timeout=0.05):
+        self.app = app
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self._queue = queue.Queue(maxsize)
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self.enqueued = self.written = self.fallbacks = self.failures = 0
+        atexit.register(self.stop)
+
+    def _ensure_started(self):
+        # A thread é criada no primeiro uso (e recriada após fork do gunicorn)
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name='write-behind', daemon=True)
+                self._thread.start()
+
+    def submit(self, Model, values):
+        """Enfileira uma linha; False se a fila continuar cheia (gravar síncrono)."""
+        self._ensure_started()
+        now = datetime.now()
+        values.setdefault('created_at', now)
+        values.setdefault('updated_at', now)
+        try:
+            self._queue.put((Model, values), timeout=self.put_timeout)
+        except queue.Full:
+            self.fallbacks += 1
+            return False
+        self.enqueued += 1
+        return True
+
+    def _next_batch(self):
+        """Bloqueia até o primeiro item e junta o que mais estiver na fila."""
+        items = [self._queue.get(timeout=self.flush_interval)]
+        while len(items) < self.batch_size:
+            try:
+                items.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return items
+
+    def _run(self):
+        while True:
+            try:
+                items = self._next_batch()
+            except queue.Empty:
+                continue
+
+            stop = any(item is _STOP for item in items)
+            rows = [item for item in items if item is not _STOP]
+            if rows:
+                with self.app.app_context():
+                    self._write(rows)
+            for _ in items:
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _write(self, rows):
+        by_model = {}
+        for Model, values in rows:
+            by_model.setdefault(Model, []).append(values)
+
+        for Model, values in by_model.items():
+            try:
+                db.session.execute(insert(Model), values)
+                db.session.commit()
+                self.written += len(values)
+            except Exception:
+                db.session.rollback()
+                self.app.logger.exception(
+                    f"write-behind: falha no lote de {Model.__tablename__}; gravando linha a linha"
+                )
+                self._write_one_by_one(Model, values)
+            finally:
+                db.session.remove()
+
+    def _write_one_by_one(self, Model, values):
+        for row in values:
+            try:
+                db.session.execute(insert(Model), [row])
+                db.session.commit()
+                self.written += 1
+            except Exception:
+                db.session.rollback()
+                self.failures += 1
+                self.app.logger.exception(f"write-behind: linha descartada em {Model.__tablename__}")
+
+    def flush(self):
+        """Espera até que tudo o que foi enfileirado esteja gravado."""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.join()
+
+    def stop(self):
+        """Grava o que falta e encerra a thread (registrado no atexit)."""
+        if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def stats(self):
+        return {
+            'queued': self._queue.qsize(),
+            'enqueued': self.enqueued,
+            'written': self.written,
+            'fallbacks': self.fallbacks,
+            'failures': self.failures,
+        }
+
+
+def init_write_behind(app):
+    """Registra a fila em `app.extensions` quando o modo está habilitado."""
+    if not app.config.get('WRITE_BEHIND_ENABLED'):
+        return None
+    writer = WriteBehindQueue(
+        app,
+        maxsize=app.config['WRITE_BEHIND_QUEUE_SIZE'],
+        batch_size=app.config['WRITE_BEHIND_BATCH_SIZE'],
+        flush_interval=app.config['WRITE_BEHIND_FLUSH_INTERVAL'],
+        put_timeout=app.config['WRITE_BEHIND_PUT_TIMEOUT'],
+    )
+    app.extensions['write_behind'] = writer
+    return writer
@@ -0,0 +1,266 @@
+"""Teste de carga ponta a ponta contra o app em processo, com SQLite.
+
+Sobe o `create_app("testing")` num arquivo SQLite temporário, popula usuários
+e simulações e dispara as rotas reais a partir de várias threads, cada uma
+com seu próprio test client logado como um usuário do seed:
+
+    POST /simulate/sac
+    GET  /history
+    GET  /simulation/<type_id>/<id>
+    GET  /api/types/<type_id>/operations
+
+Reporta vazão, latência p50/p90/p99, consultas SQL por requisição (lidas do
+contador de SQL das métricas, incluindo as do corpo em streaming) e quantas
+requisições a auditoria de SQL marcou. No modo testing a auditoria levanta
+`QueryBudgetExceeded`; a requisição conta como erro e o script termina com
+código 1 se alguma foi marcada.
+
+    python benchmarks/load.py --workers 8 --requests 200 --output load.json
+"""
+import os
+import sys
+import json
+import random
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Peso de cada rota no sorteio das requisições
+ROUTE_MIX = (
+    ("POST /simulate/sac", 1),
+    ("GET /history", 3),
+    ("GET /simulation/<type_id>/<id>", 3),
+    ("GET /api/types/<type_id>/operations", 1),
+)
+
+_queries = threading.local()
+
+
+def create_test_app(database_path):
+    """App com a configuração "testing" apontando para `database_path`."""
+    os.environ["TEST_DATABASE_URL"] = f"sqlite:///{database_path}"
+
+    from app import create_app, setup_database
+    from app.config import TestingConfig
+
+    # A configuração lê o ambiente na importação; garante o arquivo pedido
+    TestingConfig.SQLALCHEMY_DATABASE_URI = f"sqlite:///{database_path}"
+    app = create_app("testing")
+    with app.app_context():
+        setup_database(app)
+    return app
+
+
+def install_query_counter(app):
+    """Guarda na thread atual as consultas da última requisição."""
+    from app.services.metrics import current_sql
+
+    # teardown_request roda depois do corpo em streaming (stream_with_context)
+    @app.teardown_request
+    def _store_count(exc):
+        _queries.count = current_sql().count
+
+
+def seed(app, users, simulations, seed_value=0):
+    """Insere usuários e simulações SAC/PRICE; devolve [(user_id, [(type_id, id), ...])]."""
+    from sqlalchemy import insert
+    from app.controllers import calculator_controller as calc
+    from app.models import db, User, EntrySAC, EntryPrice, type_enum
+    from app.services import type_registry
+    from app.services.summary import build_summary
+
+    rng = random.Random(seed_value)
+    started = datetime.now() - timedelta(days=365)
+
+    with app.app_context():
+        sac_type = type_registry.get_type_id(type_enum.Type.SAC)
+        price_type = type_registry.get_type_id(type_enum.Type.PRICE)
+
+        db.session.execute(insert(User), [
+            {"name": f"Carga {i}", "email": f"carga{i}@example.com", "password_hash": "x"}
+            for i in range(users)
+        ])
+        db.session.commit()
+        user_ids = [u.id for u in User.query.order_by(User.id).all()]
+
+        rows = {EntrySAC: [], EntryPrice: []}
+        for user_id in user_ids:
+            for i in range(simulations):
+                Model = EntrySAC if i % 2 == 0 else EntryPrice
+                principal_value = float(rng.choice((10000, 50000, 150000, 300000)))
+                months = rng.choice((12, 36, 120, 360))
+                interest_rate = rng.choice((0.8, 1.2, 2.0))
+                if Model is EntrySAC:
+                    tabela, total_interest, total_amount = calc.sac_system_calculation(
+                        principal_value, months, interest_rate)
+                else:
+                    tabela, total_interest, total_amount = calc.price_system_calculation(
+                        principal_value, months, interest_rate)
+                output_data = {"tabela": tabela, "total_interest": total_interest,
+                               "total_amount": total_amount}
+                rows[Model].append({
+                    "user_id": user_id,
+                    "type_id": sac_type if Model is EntrySAC else price_type,
+                    "principal_value": principal_value,
+                    "interest_rate": interest_rate,
+                    "months": months,
+                    "output_data": output_data,
+                    "summary": build_summary(output_data),
+                    "created_at": started + timedelta(minutes=rng.randint(0, 525600)),
+                })
+
+        for Model, values in rows.items():
+            if values:
+                db.session.execute(insert(Model), values)
+        db.session.commit()
+
+        owned = {user_id: [] for user_id in user_ids}
+        for Model, type_id in ((EntrySAC, sac_type), (EntryPrice, price_type)):
+            for entry_id, user_id in db.session.query(Model.id, Model.user_id):
+                owned[user_id].append((type_id, entry_id))
+
+    return [(user_id, owned[user_id]) for user_id in user_ids], (sac_type, price_type)
+
+
+def _worker(app, user_id, entries, type_ids, requests, seed_value, samples):
+    from app.services.query_audit import QueryBudgetExceeded
+
+    rng = random.Random(seed_value)
+    routes, weights = zip(*ROUTE_MIX)
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["user_id"] = user_id
+
+    for _ in range(requests):
+        route = rng.choices(routes, weights)[0]
+        if route == "POST /simulate/sac":
+            call = lambda: client.post("/simulate/sac", data={
+                "principal_value": str(rng.randint(1000, 500000)),
+                "months": str(rng.choice((12, 60, 120, 360))),
+                "interest_rate": str(rng.choice((0.5, 1.0, 1.5, 2.0))),
+            })
+        elif route == "GET /history":
+            call = lambda: client.get("/history")
+        elif route == "GET /simulation/<type_id>/<id>":
+            type_id, entry_id = rng.choice(entries)
+            call = lambda: client.get(f"/simulation/{type_id}/{entry_id}")
+        else:
+            type_id = rng.choice(type_ids)
+            call = lambda: client.get(f"/api/types/{type_id}/operations")
+
+        _queries.count = 0
+        t0 = time.perf_counter()
+        try:
+            status, flagged = call().status_code, False
+        except QueryBudgetExceeded:
+            status, flagged = 500, True
+        elapsed = time.perf_counter() - t0
+        samples.append((route, elapsed, _queries.count, status, flagged))
+
+
+def _percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(samples, wall_time):
+    report = {
+        "total_requests": len(samples),
+        "wall_time_s": round(wall_time, 3),
+        "throughput_rps": round(len(samples) / wall_time, 1) if wall_time else None,
+        "routes": {},
+    }
+    for route, _ in ROUTE_MIX:
+        rows = [s for s in samples if s[0] == route]
+        if not rows:
+            continue
+        latencies = sorted(s[1] * 1000 for s in rows)
+        queries = [s[2] for s in rows]
+        report["routes"][route] = {
+            "requests": len(rows),
+            "errors": sum(1 for s in rows if s[3] >= 300),
+            "p50_ms": round(_percentile(latencies, 0.50), 2),
+            "p90_ms": round(_percentile(latencies, 0.90), 2),
+            "p99_ms": round(_percentile(latencies, 0.99), 2),
+            "queries_avg": round(sum(queries) / len(queries), 2),
+            "queries_max": max(queries),
+            "sql_audit_flagged": sum(1 for s in rows if s[4]),
+        }
+    return report
+
+
+def run(users, simulations, workers, requests, database_path=None):
+    cleanup = database_path is None
+    if cleanup:
+        fd, database_path = tempfile.mkstemp(prefix="ifinance_load_", suffix=".db")
+        os.close(fd)
+        os.remove(database_path)
+
+    try:
+        app = create_test_app(database_path)
+        seeded, type_ids = seed(app, users, simulations)
+        install_query_counter(app)
+
+        samples = []
+        threads = [
+            threading.Thread(
+                target=_worker,
+                args=(app, *seeded[i % len(seeded)], type_ids, requests, i, samples)
+            )
+            for i in range(workers)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall_time = time.perf_counter() - started
+
+        report = summarize(samples, wall_time)
+        report["config"] = {"users": users, "simulations_per_user": simulations,
+                            "workers": workers, "requests_per_worker": requests}
+        return report
+    finally:
+        if cleanup and os.path.exists(database_path):
+            os.remove(database_path)
+
+
+def print_report(report):
+    print(f"\n{report['total_requests']} requisições em {report['wall_time_s']} s "
+          f"({report['throughput_rps']} req/s)")
+    print(f"{'rota':<40} {'n':>6} {'erros':>6} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} "
+          f"{'sql/req':>8} {'audit':>6}")
+    for route, row in report["routes"].items():
+        print(f"{route:<40} {row['requests']:>6} {row['errors']:>6} {row['p50_ms']:>9.2f} "
+              f"{row['p90_ms']:>9.2f} {row['p99_ms']:>9.2f} {row['queries_avg']:>8.2f} "
+              f"{row['sql_audit_flagged']:>6}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Teste de carga das rotas com SQLite em processo")
+    parser.add_argument("--users", type=int, default=20, help="Usuários criados no seed")
+    parser.add_argument("--simulations", type=int, default=50, help="Simulações por usuário")
+    parser.add_argument("--workers", type=int, default=4, help="Threads concorrentes")
+    parser.add_argument("--requests", type=int, default=100, help="Requisições por thread")
+    parser.add_argument("--database", help="Arquivo SQLite novo (padrão: temporário, apagado ao fim)")
+    parser.add_argument("--output", help="Grava o relatório neste arquivo JSON")
+
+    args = parser.parse_args()
+
+    report = run(args.users, args.simulations, args.workers, args.requests, args.database)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fp:
+            json.dump(report, fp, indent=2, ensure_ascii=False)
+        print(f"\nRelatório gravado em {args.output}")
+
+    flagged = sum(row["sql_audit_flagged"] for row in report["routes"].values())
+    if flagged:
+        print(f"\n{flagged} requisições acima do orçamento de SQL ou com N+1")
+        sys.exit(1)
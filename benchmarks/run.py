@@ -0,0 +1,195 @@
+"""Microbenchmarks das calculadoras (calculator_controller, EntrySAC e lote).
+
+Mede cada função em vários prazos (12 a 480 meses) e o cálculo em lote em
+vários tamanhos, reportando ops/s, latência p50/p99 e pico de memória
+(tracemalloc). O cache das calculadoras fica desligado durante a medição.
+
+    python benchmarks/run.py --output benchmarks/baseline.json
+    python benchmarks/run.py --compare benchmarks/baseline.json --threshold 0.15
+
+Com `--compare`, o processo termina com código 1 se algum caso ficar mais
+lento que a referência além do limite.
+"""
+import os
+import sys
+import json
+import time
+import platform
+import tracemalloc
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Os benchmarks não usam banco; evita depender das variáveis DB_* ao importar o app
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+TERMS = (12, 60, 120, 240, 360, 480)
+BATCH_SIZES = (1, 10, 100, 1000)
+PRINCIPAL = 250000.0
+RATE = 1.37
+
+
+def build_cases(terms=TERMS, batch_sizes=BATCH_SIZES):
+    """Lista de (nome, parâmetros, função sem argumentos) a medir."""
+    import numpy as np
+    from app.controllers import calculator_controller as calc
+    from app.models import EntrySAC, type_enum
+    from app.services import batch
+    from app.services.cache import calculator_cache
+
+    # Mede o cálculo, não o cache (inclusive a PRICE chamada dentro do CET)
+    calculator_cache.configure(maxsize=0, ttl=0)
+
+    cases = []
+    for months in terms:
+        args = (PRINCIPAL, months, RATE)
+        cases += [
+            ("sac_system_calculation", {"months": months},
+             lambda a=args: calc.sac_system_calculation(*a)),
+            ("price_system_calculation", {"months": months, "engine": "float"},
+             lambda a=args: calc.price_system_calculation(*a)),
+            ("price_system_calculation", {"months": months, "engine": "cents"},
+             lambda a=args: calc.price_system_calculation(*a, engine="cents")),
+            ("cet_calculation", {"months": months},
+             lambda a=args: calc.cet_calculation(*a, 1500.0, 800.0, 300.0)),
+            ("fixed_income_simulation", {"months": months, "engine": "float"},
+             lambda a=args: calc.fixed_income_simulation(*a)),
+            ("fixed_income_simulation", {"months": months, "engine": "cents"},
+             lambda a=args: calc.fixed_income_simulation(*a, engine="cents")),
+            ("EntrySAC.calculate_total_interest", {"months": months},
+             lambda a=args: EntrySAC.calculate_total_interest(*a)),
+            ("EntrySAC.calculate_payment_at", {"months": months},
+             lambda a=args: EntrySAC.calculate_payment_at(*a, a[1] // 2 + 1)),
+            ("EntrySAC.calculate_payments", {"months": months},
+             lambda a=args: EntrySAC.calculate_payments(*a)),
+            ("EntrySAC.calculate_summary", {"months": months},
+             lambda a=args: EntrySAC.calculate_summary(*a)),
+        ]
+
+    rng = np.random.default_rng(0)
+    for size in batch_sizes:
+        principal = rng.uniform(1000, 1000000, size)
+        months = rng.integers(12, 481, size)
+        rate = rng.uniform(0.1, 3.0, size)
+        fees = principal * 0.02
+        for kind in (type_enum.Type.SAC, type_enum.Type.PRICE, type_enum.Type.CET):
+            cases.append((
+                f"batch.summarize[{kind.name.lower()}]", {"batch_size": size},
+                lambda k=kind, p=principal, n=months, r=rate, f=fees: batch.summarize(k, p, n, r, f)
+            ))
+    return cases
+
+
+def _percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def measure(func, min_time=0.2, min_runs=5, max_runs=10000):
+    """Executa `func` repetidamente e devolve ops/s, p50/p99 (µs) e pico de memória."""
+    func()  # aquecimento
+
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < max_runs:
+        t0 = time.perf_counter_ns()
+        func()
+        timings.append(time.perf_counter_ns() - t0)
+        if len(timings) >= min_runs and time.perf_counter() - started >= min_time:
+            break
+
+    # Pico de memória medido à parte: o tracemalloc distorce os tempos
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings.sort()
+    total = sum(timings) / 1e9
+    return {
+        "runs": len(timings),
+        "ops_per_sec": round(len(timings) / total, 2) if total else None,
+        "p50_us": round(_percentile(timings, 0.50) / 1e3, 2),
+        "p99_us": round(_percentile(timings, 0.99) / 1e3, 2),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def case_key(name, params):
+    return name + "[" + ",".join(f"{k}={v}" for k, v in sorted(params.items())) + "]"
+
+
+def run(min_time, filter_text=None, terms=TERMS, batch_sizes=BATCH_SIZES):
+    results = {}
+    for name, params, func in build_cases(terms, batch_sizes):
+        key = case_key(name, params)
+        if filter_text and filter_text not in key:
+            continue
+        results[key] = {"name": name, "params": params, **measure(func, min_time=min_time)}
+        row = results[key]
+        print(f"{key:<60} {row['ops_per_sec']:>12,.1f} ops/s  "
+              f"p50 {row['p50_us']:>10,.1f} µs  p99 {row['p99_us']:>10,.1f} µs  "
+              f"pico {row['peak_kib']:>9,.1f} KiB")
+    return results
+
+
+def metadata():
+    import numpy as np
+
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+    }
+
+
+def compare(results, baseline, threshold):
+    """Casos cujo ops/s caiu mais que `threshold` (fração) em relação à referência."""
+    regressions = []
+    for key, row in results.items():
+        reference = baseline.get("results", {}).get(key)
+        if not reference or not reference.get("ops_per_sec") or not row.get("ops_per_sec"):
+            continue
+        change = row["ops_per_sec"] / reference["ops_per_sec"] - 1
+        if change < -threshold:
+            regressions.append((key, reference["ops_per_sec"], row["ops_per_sec"], change))
+    return regressions
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Microbenchmarks das calculadoras")
+    parser.add_argument("--output", help="Grava os resultados neste arquivo JSON")
+    parser.add_argument("--compare", help="JSON de referência para detectar regressões")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Queda de ops/s tolerada antes de sinalizar regressão (padrão: 0.10)")
+    parser.add_argument("--min-time", type=float, default=0.2,
+                        help="Tempo mínimo de medição por caso, em segundos")
+    parser.add_argument("--filter", help="Roda apenas casos cujo nome contém este texto")
+    parser.add_argument("--quick", action="store_true",
+                        help="Só prazos 12/360 e lotes 1/100 (para CI)")
+
+    args = parser.parse_args()
+
+    terms = (12, 360) if args.quick else TERMS
+    batch_sizes = (1, 100) if args.quick else BATCH_SIZES
+    results = run(args.min_time, args.filter, terms, batch_sizes)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fp:
+            json.dump({"meta": metadata(), "results": results}, fp, indent=2, ensure_ascii=False)
+        print(f"\nResultados gravados em {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fp:
+            baseline = json.load(fp)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regressões (queda de ops/s acima de {args.threshold:.0%}):")
+            for key, before, after, change in regressions:
+                print(f"  {key}: {before:,.1f} -> {after:,.1f} ops/s ({change:+.1%})")
+            sys.exit(1)
+        print(f"\nSem regressões em relação a {args.compare}")
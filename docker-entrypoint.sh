@@ -0,0 +1,10 @@
+#!/bin/sh
+# Prepara o banco (tabelas ausentes e tipos iniciais, idempotente) antes de
+# subir o servidor: o create_app não faz mais isso a cada boot de worker.
+set -e
+
+if [ "${DB_SETUP_ON_DEPLOY:-true}" = "true" ]; then
+    flask setup-db
+fi
+
+exec "$@"
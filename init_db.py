@@ -117,17 +117,142 @@ def reset_database():
     print("Reset do banco concluído!")
     return True
 
+def _add_missing_columns(db, Model, existing_columns):
+    """Adiciona ao banco as colunas do modelo que ainda não existem na tabela."""
+    from sqlalchemy import text
+
+    table = Model.__table__
+    added = []
+    for column in table.columns:
+        if column.name in existing_columns:
+            continue
+        column_type = column.type.compile(dialect=db.engine.dialect)
+        db.session.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+        added.append(column.name)
+    db.session.commit()
+    return added
+
+
+def _add_missing_indexes(db, Model, inspector):
+    """Cria os índices declarados no modelo que ainda não existem na tabela."""
+    existing = {index['name'] for index in inspector.get_indexes(Model.__tablename__)}
+    created = []
+    for index in Model.__table__.indexes:
+        if index.name not in existing:
+            index.create(db.engine)
+            created.append(index.name)
+    return created
+
+
+def _backfill_summaries(db, Model, batch_size=500):
+    """Preenche a coluna `summary` a partir do `output_data` das linhas antigas."""
+    from sqlalchemy.orm import undefer
+    from app.services.summary import build_summary
+
+    total = 0
+    while True:
+        rows = (Model.query
+                .options(undefer(Model.output_data))
+                .filter(Model.summary.is_(None))
+                .limit(batch_size)
+                .all())
+        if not rows:
+            return total
+        for row in rows:
+            row.summary = build_summary(row.output_data)
+        db.session.commit()
+        total += len(rows)
+
+
+def _ensure_unique_type_names(db, inspector):
+    """Cria o índice único de `type_operations.name` se ainda não existir."""
+    from sqlalchemy import func, text
+    from app.models import TypeOperation
+
+    name = 'uq_type_operations_name'
+    unique_names = {c['name'] for c in inspector.get_unique_constraints('type_operations')}
+    unique_names |= {i['name'] for i in inspector.get_indexes('type_operations') if i.get('unique')}
+    if name in unique_names:
+        return
+
+    duplicates = (db.session.query(TypeOperation.name)
+                  .group_by(TypeOperation.name)
+                  .having(func.count(TypeOperation.id) > 1)
+                  .all())
+    if duplicates:
+        print(f"type_operations: nomes duplicados {[d.name for d in duplicates]}; "
+              "remova-os e execute novamente para criar o índice único")
+        return
+
+    db.session.execute(text(f"CREATE UNIQUE INDEX {name} ON type_operations (name)"))
+    db.session.commit()
+    print(f"type_operations: índice único {name} criado")
+
+
+def upgrade_database():
+    print("Atualizando esquema do banco (sem apagar dados)...")
+    print("=" * 50)
+
+    try:
+        from app import create_app, convert_output_column
+        from app.models import db, ENTRY_MODELS
+
+        app = create_app()
+
+        with app.app_context():
+            inspector = db.inspect(db.engine)
+            existing_tables = inspector.get_table_names()
+
+            if 'type_operations' in existing_tables:
+                _ensure_unique_type_names(db, inspector)
+
+            for Model in ENTRY_MODELS.values():
+                table_name = Model.__tablename__
+                if table_name not in existing_tables:
+                    Model.__table__.create(db.engine)
+                    print(f"{table_name}: tabela criada")
+                    continue
+
+                existing_columns = {c['name'] for c in inspector.get_columns(table_name)}
+                added = _add_missing_columns(db, Model, existing_columns)
+                if added:
+                    print(f"{table_name}: colunas adicionadas {added}")
+
+                # Antes do backfill: as gravações passam a ser BLOB comprimido
+                if convert_output_column(Model, inspector):
+                    print(f"{table_name}: output_data convertida para BLOB (CompressedJSON)")
+
+                created = _add_missing_indexes(db, Model, inspector)
+                if created:
+                    print(f"{table_name}: índices criados {created}")
+
+                filled = _backfill_summaries(db, Model)
+                if filled:
+                    print(f"{table_name}: {filled} resumos preenchidos")
+
+            print("\nAtualização concluída com sucesso!")
+
+    except Exception as e:
+        print(f"Erro durante a atualização: {e}")
+        return False
+
+    return True
+
 if __name__ == "__main__":
     import argparse
     
     parser = argparse.ArgumentParser(description='Script de inicialização do banco de dados')
     parser.add_argument('--reset', action='store_true', 
                        help='Remove todas as tabelas e dados')
+    parser.add_argument('--upgrade', action='store_true',
+                       help='Adiciona colunas, índices e resumos novos e converte output_data para BLOB, sem apagar dados')
     
     args = parser.parse_args()
     
     if args.reset:
         success = reset_database()
+    elif args.upgrade:
+        success = upgrade_database()
     else:
         success = init_database()
     
@@ -0,0 +1,119 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+TABLES = {
+    'price': ('PRICE_ENGINES', 'saldo_devedor'),
+    'fixed_income': ('FIXED_INCOME_ENGINES', 'saldo'),
+}
+
+
+def random_cases(count, seed):
+    """Cenários aleatórios no formato digitado nos formulários (2 casas)."""
+    import random
+
+    rng = random.Random(seed)
+    for _ in range(count):
+        principal_value = round(rng.uniform(100, 1_000_000), 2)
+        months = rng.randint(1, 420)
+        interest_rate = round(rng.uniform(0.01, 5), 2)
+        yield principal_value, months, interest_rate
+
+
+def compare(table, principal_value, months, interest_rate):
+    """Compara os motores "float" e "cents" de uma tabela; devolve as diferenças."""
+    import numpy as np
+    from app.services import schedules
+
+    engines_attr, balance_column = TABLES[table]
+    engines = getattr(schedules, engines_attr)
+    legacy = engines['float'](principal_value, months, interest_rate)
+    cents = engines['cents'](principal_value, months, interest_rate)
+
+    legacy_total = round(schedules.running_total(legacy['juros']), 2)
+    cents_total = round(schedules.running_total(cents['juros']), 2)
+    legacy_balance = round(float(legacy[balance_column][-1]), 2)
+    cents_balance = round(float(cents[balance_column][-1]), 2)
+
+    differing = {}
+    for column in legacy:
+        delta = np.abs(np.asarray(legacy[column]) - np.asarray(cents[column]))
+        rows = np.nonzero(delta > 0.005)[0]
+        if len(rows):
+            differing[column] = (int(rows[0]) + 1, len(rows), round(float(delta.max()), 2))
+
+    return {
+        'differing': differing,
+        'legacy_total': legacy_total,
+        'cents_total': cents_total,
+        'legacy_final_balance': legacy_balance,
+        'cents_final_balance': cents_balance,
+        'totals_delta': round(max(abs(legacy_total - cents_total), abs(legacy_balance - cents_balance)), 2),
+    }
+
+
+def run_report(table, count, seed, show, tolerance=0.0):
+    """Imprime o relatório; False se juros totais ou saldo final diferem além de `tolerance`."""
+    print(f"Paridade {table}: motor float (legado) x centavos inteiros")
+    print("=" * 50)
+
+    differing_cases = 0
+    total_mismatches = 0
+    beyond_tolerance = 0
+    column_counts = {}
+    examples = []
+
+    for case in random_cases(count, seed):
+        result = compare(table, *case)
+        if not result['differing']:
+            continue
+
+        differing_cases += 1
+        if result['legacy_total'] != result['cents_total']:
+            total_mismatches += 1
+        if result['totals_delta'] > tolerance:
+            beyond_tolerance += 1
+        for column in result['differing']:
+            column_counts[column] = column_counts.get(column, 0) + 1
+        if len(examples) < show:
+            examples.append((case, result))
+
+    print(f"Cenários comparados: {count} (seed {seed})")
+    print(f"Cenários com alguma célula diferente: {differing_cases}")
+    print(f"Cenários com juros totais diferentes: {total_mismatches}")
+    print(f"Cenários com totais ou saldo final além da tolerância ({tolerance:.2f}): {beyond_tolerance}")
+    for column, hits in sorted(column_counts.items()):
+        print(f"  {column}: {hits} cenários")
+
+    for (principal_value, months, interest_rate), result in examples:
+        print(f"\nP={principal_value:,.2f} n={months} i={interest_rate}% a.m.")
+        for column, (first_row, rows, max_delta) in result['differing'].items():
+            print(f"  {column}: {rows} linhas a partir do mês {first_row}, diferença máx. {max_delta:.2f}")
+        print(f"  juros totais: float {result['legacy_total']:,.2f} | centavos {result['cents_total']:,.2f}")
+        if table == 'price':
+            print(f"  saldo final: float {result['legacy_final_balance']:,.2f} | "
+                  f"centavos {result['cents_final_balance']:,.2f}")
+
+    return beyond_tolerance == 0
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Relatório de paridade entre os motores de cálculo')
+    parser.add_argument('--table', choices=sorted(TABLES), default='price',
+                        help='Tabela comparada (padrão: price)')
+    parser.add_argument('--cases', type=int, default=1000,
+                        help='Quantidade de cenários aleatórios')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Semente dos cenários')
+    parser.add_argument('--show', type=int, default=5,
+                        help='Exemplos detalhados exibidos')
+    parser.add_argument('--tolerance', type=float, default=0.0,
+                        help='Diferença aceita nos juros totais e no saldo final, em reais (padrão: 0)')
+
+    args = parser.parse_args()
+
+    success = run_report(args.table, args.cases, args.seed, args.show, args.tolerance)
+    sys.exit(0 if success else 1)